@@ -1,5 +1,178 @@
+"""Command line utilities for the Demo test suite."""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules whose import cost bench-import tracks: everything a test module pulls in
+IMPORT_BENCH_MODULES = [
+    "src.demo.pages.login_page",
+    "src.demo.pages.products_page",
+    "src.demo.pages.favorites_page",
+    "src.demo.utils.driver_factory",
+    "src.demo.utils.driver_pool",
+    "src.demo.utils.status_reporter",
+]
+
+
+def bench_startup(args):
+    """Compare local Chrome startup time for the standard and lean modes."""
+    from src.demo.utils.driver_factory import DriverFactory
+    
+    modes = {"standard": False, "lean": True}
+    results = {}
+    for mode, lean in modes.items():
+        timings = []
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            driver = DriverFactory._create_local_driver(lean=lean)
+            driver.get("about:blank")
+            timings.append(time.perf_counter() - start)
+            driver.quit()
+        results[mode] = timings
+    DriverFactory.stop_chrome_service()
+    
+    for mode, timings in results.items():
+        print(
+            f"{mode:>8}: median {statistics.median(timings):.2f}s, "
+            f"min {min(timings):.2f}s, max {max(timings):.2f}s over {len(timings)} runs"
+        )
+    speedup = statistics.median(results["standard"]) / statistics.median(results["lean"])
+    print(f"lean mode is {speedup:.1f}x faster to first navigation")
+
+
+def _import_times(statement: str) -> dict:
+    """Run a statement under -X importtime and get self-time (us) per imported module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(self_us)
+    return times
+
+
+def bench_import(args):
+    """Measure the import cost of the demo package and check it against a budget."""
+    from src.demo.config.config import Config
+    
+    modules = args.module or IMPORT_BENCH_MODULES
+    statement = "import " + ", ".join(modules)
+    budget = args.budget_ms if args.budget_ms is not None else Config.IMPORT_BUDGET_MS
+    
+    totals = []
+    costs = {}
+    for _ in range(args.iterations):
+        # Only count what the statement adds on top of interpreter startup
+        baseline = _import_times("pass")
+        times = _import_times(statement)
+        added = {module: us for module, us in times.items() if module not in baseline}
+        totals.append(sum(added.values()) / 1000)
+        for module, us in added.items():
+            costs.setdefault(module, []).append(us)
+    
+    median = statistics.median(totals)
+    print(f"import {', '.join(modules)}")
+    print(f"median {median:.1f}ms, min {min(totals):.1f}ms, max {max(totals):.1f}ms over {len(totals)} runs")
+    print("slowest modules (self time):")
+    slowest = sorted(costs.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for module, samples in slowest[:args.top]:
+        print(f"  {statistics.median(samples) / 1000:7.1f}ms  {module}")
+    
+    if median > budget:
+        print(f"FAIL: import time {median:.1f}ms exceeds budget {budget:.0f}ms")
+        sys.exit(1)
+    print(f"OK: within budget {budget:.0f}ms")
+
+
+def merge_logs(args):
+    """Interleave the per-worker JSON-lines logs by timestamp."""
+    from src.demo.utils.logger import merge_worker_logs
+    
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for entry in merge_worker_logs(args.log_dir):
+            if args.nodeid and entry.get("nodeid") != args.nodeid:
+                continue
+            output.write(json.dumps(entry) + "\n")
+    finally:
+        if args.output:
+            output.close()
+
+
+def harvest_artifacts(args):
+    """Download logs for the failed BrowserStack sessions of a build or run."""
+    from src.demo.config.config import Config
+    from src.demo.utils.browserstack_api import BrowserStackAPI
+    
+    session_ids = args.session
+    if not args.build and not session_ids:
+        # Latest status per session recorded by the last pytest run
+        statuses = {}
+        try:
+            with open(args.sessions_file) as handle:
+                for line in handle:
+                    record = json.loads(line)
+                    statuses[record["session_id"]] = record["status"]
+        except FileNotFoundError:
+            print(f"No session record at {args.sessions_file}; run the tests first or pass --build/--session")
+            sys.exit(1)
+        session_ids = [sid for sid, status in statuses.items() if args.all or status == "failed"]
+    
+    results = BrowserStackAPI().harvest_artifacts(
+        session_ids=session_ids,
+        build_id=args.build,
+        output_dir=args.output or Config.ARTIFACTS_DIR,
+        failed_only=not args.all,
+    )
+    for session_id, paths in results.items():
+        print(f"{session_id}: {len(paths)} files")
+
+
 def main():
-    print("Hello from demo!")
+    parser = argparse.ArgumentParser(description="Demo test suite utilities")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    bench = subparsers.add_parser("bench-startup", help="Benchmark local Chrome startup (standard vs lean)")
+    bench.add_argument("--iterations", type=int, default=5, help="Sessions to start per mode")
+    bench.set_defaults(func=bench_startup)
+    
+    imports = subparsers.add_parser("bench-import", help="Measure package import time against a budget")
+    imports.add_argument("--module", action="append", help="Module to import (repeatable; default: test-facing modules)")
+    imports.add_argument("--iterations", type=int, default=5, help="Fresh interpreters to measure")
+    imports.add_argument("--budget-ms", type=float, help="Fail above this median import time (default: IMPORT_BUDGET_MS)")
+    imports.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    imports.set_defaults(func=bench_import)
+    
+    merge = subparsers.add_parser("merge-logs", help="Interleave per-worker JSON-lines logs by timestamp")
+    merge.add_argument("--log-dir", help="Directory holding demo_<worker>.jsonl files (default: logs)")
+    merge.add_argument("--nodeid", help="Only include records for this test")
+    merge.add_argument("--output", help="Write merged records here instead of stdout")
+    merge.set_defaults(func=merge_logs)
+    
+    harvest = subparsers.add_parser("harvest-artifacts", help="Download logs for failed BrowserStack sessions")
+    harvest.add_argument("--build", help="BrowserStack build ID to harvest")
+    harvest.add_argument("--session", action="append", help="Session ID to harvest (repeatable)")
+    harvest.add_argument(
+        "--sessions-file", default="reports/sessions.jsonl",
+        help="Session record written during the run, used when no build or session is given",
+    )
+    harvest.add_argument("--output", help="Destination directory (default: reports/artifacts)")
+    harvest.add_argument("--all", action="store_true", help="Include sessions that did not fail")
+    harvest.set_defaults(func=harvest_artifacts)
+    
+    args = parser.parse_args()
+    if not args.command:
+        parser.print_help()
+        return
+    args.func(args)
 
 
 if __name__ == "__main__":
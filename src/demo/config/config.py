@@ -1,12 +1,55 @@
 """Configuration management for Demo test suite."""
 
 import os
+import tempfile
 from pathlib import Path
-from typing import Dict, Any
-from dotenv import load_dotenv
+from typing import Any, Callable, Dict, Optional
 
-# Load environment variables
-load_dotenv()
+_dotenv_loaded = False
+
+
+def _load_dotenv():
+    """Load .env into the environment, once, the first time a setting is read."""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
+
+
+def _flag(value: str) -> bool:
+    """Parse a "true"/"false" environment value."""
+    return value.lower() == "true"
+
+
+class _EnvSetting:
+    """
+    Config attribute read from the environment on first access.
+    
+    Importing the config module therefore reads neither .env nor the
+    environment. The resolved value replaces the descriptor on the class,
+    so later reads are plain attribute lookups and assignments (including
+    monkeypatching) behave as before.
+    """
+    
+    def __init__(self, name: str, default: Optional[str] = None, convert: Callable[[str], Any] = None):
+        self.name = name
+        self.default = default
+        self.convert = convert
+    
+    def __set_name__(self, owner, attr: str):
+        self.attr = attr
+    
+    def __get__(self, instance, owner):
+        _load_dotenv()
+        value = os.getenv(self.name, self.default)
+        if value is not None and self.convert:
+            value = self.convert(value)
+        setattr(owner, self.attr, value)
+        return value
+
+
+_env = _EnvSetting
 
 
 class Config:
@@ -16,70 +59,160 @@ class Config:
     PROJECT_NAME = "Demo"
     
     # URLs
-    BASE_URL = os.getenv("BASE_URL", "https://www.bstackdemo.com")
+    BASE_URL = _env("BASE_URL", "https://www.bstackdemo.com")
     
     # BrowserStack Configuration
-    BROWSERSTACK_USERNAME = os.getenv("BROWSERSTACK_USERNAME")
-    BROWSERSTACK_ACCESS_KEY = os.getenv("BROWSERSTACK_ACCESS_KEY")
+    BROWSERSTACK_USERNAME = _env("BROWSERSTACK_USERNAME")
+    BROWSERSTACK_ACCESS_KEY = _env("BROWSERSTACK_ACCESS_KEY")
+    USE_BROWSERSTACK = _env("USE_BROWSERSTACK", "true")
     BROWSERSTACK_HUB_URL = "https://hub-cloud.browserstack.com/wd/hub"
     
+    # BrowserStack REST API
+    BROWSERSTACK_API_URL = _env("BROWSERSTACK_API_URL", "https://api.browserstack.com/automate")
+    BROWSERSTACK_API_POOL_SIZE = _env("BROWSERSTACK_API_POOL_SIZE", "4", int)
+    BROWSERSTACK_API_RETRIES = _env("BROWSERSTACK_API_RETRIES", "3", int)
+    BROWSERSTACK_SESSION_WAIT = _env("BROWSERSTACK_SESSION_WAIT", "30", int)
+    BUILD_SESSIONS_PAGE_SIZE = _env("BUILD_SESSIONS_PAGE_SIZE", "100", int)
+    ARTIFACT_WORKERS = _env("ARTIFACT_WORKERS", "4", int)
+    
+    # Token bucket shared by all processes on this machine (0 disables)
+    BROWSERSTACK_API_RATE = _env("BROWSERSTACK_API_RATE", "2", float)
+    BROWSERSTACK_API_BURST = _env("BROWSERSTACK_API_BURST", "5", int)
+    BROWSERSTACK_RATE_LIMIT_FILE = _env(
+        "BROWSERSTACK_RATE_LIMIT_FILE", str(Path(tempfile.gettempdir()) / "demo-browserstack-api.bucket"), Path
+    )
+    
+    # Fail fast on repeated session creation failures (see utils/circuit_breaker.py)
+    SESSION_BREAKER_THRESHOLD = _env("SESSION_BREAKER_THRESHOLD", "3", int)
+    SESSION_BREAKER_WINDOW = _env("SESSION_BREAKER_WINDOW", "300", float)
+    SESSION_BREAKER_COOLDOWN = _env("SESSION_BREAKER_COOLDOWN", "60", float)
+    SESSION_BREAKER_PROBE_TIMEOUT = _env("SESSION_BREAKER_PROBE_TIMEOUT", "180", float)
+    
+    # Background session status reporting (see utils/status_reporter.py)
+    STATUS_FLUSH_TIMEOUT = _env("STATUS_FLUSH_TIMEOUT", "120", float)
+    STATUS_MAX_ATTEMPTS = _env("STATUS_MAX_ATTEMPTS", "3", int)
+    
+    # Remote WebDriver command channel (see utils/remote_connection.py)
+    REMOTE_POOL_SIZE = _env("REMOTE_POOL_SIZE", "4", int)
+    REMOTE_CONNECT_TIMEOUT = _env("REMOTE_CONNECT_TIMEOUT", "10", float)
+    REMOTE_COMMAND_TIMEOUT = _env("REMOTE_COMMAND_TIMEOUT", "60", float)
+    REMOTE_RETRIES = _env("REMOTE_RETRIES", "2", int)
+    
     # Test Credentials
-    TEST_USERNAME = os.getenv("TEST_USERNAME", "demouser")
-    TEST_PASSWORD = os.getenv("TEST_PASSWORD", "testingisfun99")
+    TEST_USERNAME = _env("TEST_USERNAME", "demouser")
+    TEST_PASSWORD = _env("TEST_PASSWORD", "testingisfun99")
+    
+    # Reuse captured logins instead of the UI flow (per worker and platform)
+    AUTH_SNAPSHOTS = _env("AUTH_SNAPSHOTS", "true", _flag)
+    AUTH_SNAPSHOT_TTL = _env("AUTH_SNAPSHOT_TTL", "1800", int)
     
     # Browser Configuration
-    BROWSER_TYPE = os.getenv("BROWSER_TYPE", "chrome_windows")
-    IMPLICIT_WAIT = int(os.getenv("IMPLICIT_WAIT", "10"))
-    EXPLICIT_WAIT = int(os.getenv("EXPLICIT_WAIT", "10"))
+    BROWSER_TYPE = _env("BROWSER_TYPE", "chrome_windows")
+    EXPLICIT_WAIT = _env("EXPLICIT_WAIT", "10", int)
+    
+    # Budget for absence/visibility checks that are expected to fail fast
+    NEGATIVE_CHECK_TIMEOUT = _env("NEGATIVE_CHECK_TIMEOUT", "1", float)
+    NEGATIVE_CHECK_POLL = _env("NEGATIVE_CHECK_POLL", "0.1", float)
+    
+    # UI settle waits (DOM + network quiet window)
+    SETTLE_QUIET_MS = _env("SETTLE_QUIET_MS", "300", int)
+    SETTLE_TIMEOUT = _env("SETTLE_TIMEOUT", "10", int)
+    
+    # Adaptive waits (learned per-locator, per-platform timeouts)
+    WAIT_HISTORY_FILE = _env("WAIT_HISTORY_FILE", "reports/wait_history.json", Path)
+    WAIT_HISTORY_SIZE = _env("WAIT_HISTORY_SIZE", "50", int)
+    WAIT_MIN_SAMPLES = _env("WAIT_MIN_SAMPLES", "5", int)
+    WAIT_PERCENTILE = _env("WAIT_PERCENTILE", "95", float)
+    WAIT_SAFETY_FACTOR = _env("WAIT_SAFETY_FACTOR", "2.0", float)
+    WAIT_MIN_TIMEOUT = _env("WAIT_MIN_TIMEOUT", "2", float)
+    WAIT_COLD_START = _env("WAIT_COLD_START", "false", _flag)
+    
+    # Lean local Chrome (headless, shared chromedriver, cloned profile)
+    LOCAL_LEAN = _env("LOCAL_LEAN", "false", _flag)
+    LOCAL_WINDOW_SIZE = _env("LOCAL_WINDOW_SIZE", "1366,768")
+    CHROME_PROFILE_TEMPLATE = _env("CHROME_PROFILE_TEMPLATE", ".cache/chrome-profile-template", Path)
+    CHROME_EXTRA_ARGS = _env("CHROME_EXTRA_ARGS", "", str.split)
+    
+    # CDP network profile for local Chrome runs (see utils/network_profiles.py)
+    NETWORK_PROFILE = _env("NETWORK_PROFILE", "fast")
+    
+    # Driver session pooling
+    DRIVER_POOL = _env("DRIVER_POOL", "false", _flag)
+    DRIVER_POOL_MAX_USES = _env("DRIVER_POOL_MAX_USES", "10", int)
+    DRIVER_KEEPALIVE_INTERVAL = _env("DRIVER_KEEPALIVE_INTERVAL", "60", int)
+    
+    # Background session pre-warming (sessions created ahead of need per worker)
+    DRIVER_PREFETCH = _env("DRIVER_PREFETCH", "0", int)
+    DRIVER_PREFETCH_SHUTDOWN_TIMEOUT = _env("DRIVER_PREFETCH_SHUTDOWN_TIMEOUT", "60", int)
+    BROWSERSTACK_PARALLEL_QUOTA = _env("BROWSERSTACK_PARALLEL_QUOTA", "5", int)
     
     # Test Configuration
-    PARALLEL_EXECUTION = os.getenv("PARALLEL_EXECUTION", "true").lower() == "true"
-    TEST_TIMEOUT = int(os.getenv("TEST_TIMEOUT", "300"))
+    PARALLEL_EXECUTION = _env("PARALLEL_EXECUTION", "true", _flag)
+    TEST_TIMEOUT = _env("TEST_TIMEOUT", "300", int)
+    
+    # Attempts per page-object step on stale elements or intercepted clicks
+    STEP_MAX_ATTEMPTS = _env("STEP_MAX_ATTEMPTS", "3", int)
+    
+    # Per-test duration history for longest-first xdist scheduling
+    DURATION_HISTORY_FILE = _env("DURATION_HISTORY_FILE", "reports/duration_history.json", Path)
+    DURATION_HISTORY_SIZE = _env("DURATION_HISTORY_SIZE", "10", int)
+    DURATION_DEFAULT = _env("DURATION_DEFAULT", "60", float)
+    
+    # Budget for importing the test-facing modules (main.py bench-import)
+    IMPORT_BUDGET_MS = _env("IMPORT_BUDGET_MS", "100", float)
     
     # Logging
-    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-    LOG_TO_FILE = os.getenv("LOG_TO_FILE", "true").lower() == "true"
+    LOG_LEVEL = _env("LOG_LEVEL", "INFO")
+    LOG_TO_FILE = _env("LOG_TO_FILE", "true", _flag)
+    LOG_MAX_BYTES = _env("LOG_MAX_BYTES", str(10 * 1024 * 1024), int)
+    LOG_BACKUP_COUNT = _env("LOG_BACKUP_COUNT", "5", int)
     LOG_DIR = Path("logs")
     
     # Reporting
     REPORTS_DIR = Path("reports")
     SCREENSHOTS_DIR = Path("screenshots")
+    SCREENSHOT_BUILD_MAX_MB = _env("SCREENSHOT_BUILD_MAX_MB", "200", float)
+    SCREENSHOT_FLUSH_TIMEOUT = _env("SCREENSHOT_FLUSH_TIMEOUT", "60", float)
+    
+    # WebDriver command instrumentation
+    COMMAND_LOG = _env("COMMAND_LOG", "false", _flag)
+    COMMAND_LOG_DIR = REPORTS_DIR / "commands"
+    STATUS_QUEUE_DIR = REPORTS_DIR / "status_queue"
+    BUILD_CACHE_DIR = REPORTS_DIR / "build_cache"
+    ARTIFACTS_DIR = REPORTS_DIR / "artifacts"
+    SESSION_RECORD_FILE = REPORTS_DIR / "sessions.jsonl"
+    SESSION_BREAKER_FILE = REPORTS_DIR / "session_breaker.json"
+    COMMAND_BUDGET_FILE = _env("COMMAND_BUDGET_FILE", "tests/command_budgets.json", Path)
+    COMMAND_BUDGET_HEADROOM = _env("COMMAND_BUDGET_HEADROOM", "1.2", float)
     
-    # Browser Configurations for BrowserStack
-    BROWSER_CONFIGS: Dict[str, Dict[str, Any]] = {
-        "chrome_windows": {
-            "browserName": "Chrome",
-            "browserVersion": "latest",
-            "os": "Windows",
-            "osVersion": "10",
-            "sessionName": "Chrome on Windows 10"
-        },
-        "firefox_mac": {
-            "browserName": "Firefox",
-            "browserVersion": "latest",
-            "os": "OS X",
-            "osVersion": "Ventura",
-            "sessionName": "Firefox on macOS Ventura"
-        },
-        "samsung_mobile": {
-            "deviceName": "Samsung Galaxy S22",
-            "platformName": "Android",
-            "platformVersion": "12.0",
-            "sessionName": "Samsung Galaxy S22",
-            "realMobile": "true"
-        }
-    }
+    # Platform matrix for BrowserStack (see config/platforms.py)
+    PLATFORMS_FILE = _env("PLATFORMS_FILE", "browserstack.yml", Path)
+    PLATFORMS = _env("PLATFORMS", "")
     
     @classmethod
     def is_browserstack_enabled(cls) -> bool:
         """Check if BrowserStack credentials are configured."""
         return bool(cls.BROWSERSTACK_USERNAME and cls.BROWSERSTACK_ACCESS_KEY)
     
+    @classmethod
+    def get_platform_name(cls, browser_type: str = None) -> str:
+        """Get the key used to bucket per-platform measurements for a platform (default BROWSER_TYPE)."""
+        return (browser_type or cls.BROWSER_TYPE) if cls.is_browserstack_enabled() else "local"
+    
+    @classmethod
+    def get_platforms(cls) -> Dict[str, Dict[str, Any]]:
+        """Get the platform matrix from PLATFORMS_FILE, keyed by platform key."""
+        from .platforms import load_platform_matrix
+        return load_platform_matrix(cls.PLATFORMS_FILE)
+    
     @classmethod
     def get_browser_config(cls, browser_type: str = None) -> Dict[str, Any]:
         """Get browser configuration for specified type."""
+        platforms = cls.get_platforms()
         browser_type = browser_type or cls.BROWSER_TYPE
-        return cls.BROWSER_CONFIGS.get(browser_type, cls.BROWSER_CONFIGS["chrome_windows"])
+        if browser_type not in platforms:
+            raise ValueError(f"Unknown platform '{browser_type}'; {cls.PLATFORMS_FILE} defines: {', '.join(platforms)}")
+        return platforms[browser_type]
     
     @classmethod
     def create_directories(cls):
@@ -0,0 +1,61 @@
+"""Platform matrix loaded from browserstack.yml."""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# OS names in browserstack.yml -> suffix used in platform keys
+OS_KEY_NAMES = {
+    "windows": "windows",
+    "os x": "mac",
+    "macos": "mac",
+}
+
+_matrices: Dict[Path, Dict[str, Dict[str, Any]]] = {}
+
+
+def platform_key(platform: Dict[str, Any]) -> str:
+    """
+    Derive the short key (the BROWSER_TYPE value) for a platform entry.
+    
+    Desktop entries become ``<browser>_<os>`` (e.g. ``chrome_windows``,
+    ``firefox_mac``); devices become ``<vendor>_mobile`` (e.g.
+    ``samsung_mobile``).
+    """
+    if "deviceName" in platform:
+        return f"{platform['deviceName'].split()[0].lower()}_mobile"
+    os_name = platform.get("os", "").lower()
+    return f"{platform['browserName'].lower()}_{OS_KEY_NAMES.get(os_name, os_name.replace(' ', ''))}"
+
+
+def load_platform_matrix(path: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the ``platforms`` list of a browserstack.yml file, keyed by platform key.
+    
+    The file is parsed once per process; it is the single source for
+    platform capabilities, shared with the BrowserStack SDK.
+    
+    Args:
+        path: Path to browserstack.yml
+    
+    Returns:
+        Dict of platform key to the platform's capabilities, in file order
+    """
+    path = Path(path)
+    if path not in _matrices:
+        import yaml
+        
+        with open(path) as handle:
+            document = yaml.safe_load(handle) or {}
+        
+        matrix = {}
+        for platform in document.get("platforms", []):
+            key = platform_key(platform)
+            if key in matrix:
+                raise ValueError(f"Duplicate platform key '{key}' in {path}")
+            matrix[key] = dict(platform)
+        logger.debug(f"Loaded {len(matrix)} platforms from {path}: {', '.join(matrix)}")
+        _matrices[path] = matrix
+    return _matrices[path]
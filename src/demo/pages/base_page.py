@@ -1,36 +1,240 @@
 """Base page class for all page objects."""
 
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import (
+    TimeoutException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+)
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 import logging
+import time
 
 from ..config.config import Config
+from ..utils.driver_factory import DriverFactory
+from ..utils.screenshot_service import get_screenshot_service
+from ..utils.wait_engine import get_wait_engine
+
+# WebDriverWait and expected_conditions pull in the whole WebDriver stack,
+# so they are imported on first use rather than when page modules load
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webelement import WebElement
 
 logger = logging.getLogger(__name__)
 
+# Element cache hits and misses of the running test, across its page objects
+_cache_counts = {"hits": 0, "misses": 0}
+
+
+def take_cache_counts() -> Dict[str, int]:
+    """Return the current test's element cache counters and reset them."""
+    counts = dict(_cache_counts)
+    _cache_counts.update(hits=0, misses=0)
+    return counts
+
+
+# Installs (once per document) a MutationObserver and a fetch/XHR in-flight
+# counter, then resolves once the DOM and network have been quiet for
+# `quietMs`, or reports `settled: false` when `timeoutMs` elapses first.
+_SETTLE_SCRIPT = """
+var quietMs = arguments[0], timeoutMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var w = window;
+if (!w.__demoSettle) {
+    var state = {inflight: 0, last: Date.now()};
+    var touch = function () { state.last = Date.now(); };
+    new MutationObserver(touch).observe(document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+    if (w.fetch) {
+        var origFetch = w.fetch;
+        w.fetch = function () {
+            state.inflight++; touch();
+            var end = function () { state.inflight--; touch(); };
+            return origFetch.apply(this, arguments).then(
+                function (r) { end(); return r; },
+                function (e) { end(); throw e; }
+            );
+        };
+    }
+    var origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        state.inflight++; touch();
+        this.addEventListener('loadend', function () { state.inflight--; touch(); });
+        return origSend.apply(this, arguments);
+    };
+    w.__demoSettle = state;
+}
+var s = w.__demoSettle;
+var start = Date.now();
+(function poll() {
+    var now = Date.now();
+    var quiet = s.inflight <= 0 && document.readyState === 'complete' && now - s.last >= quietMs;
+    if (quiet || now - start >= timeoutMs) {
+        done({settled: quiet, inflight: s.inflight, elapsed: now - start});
+    } else {
+        setTimeout(poll, 50);
+    }
+})();
+"""
+
+# Resolves every container matching a locator and extracts the requested
+# fields in a single round trip. Each field is [cssSelector, attribute],
+# where attribute is "text", "class" or any DOM attribute name.
+_SNAPSHOT_SCRIPT = """
+var by = arguments[0], value = arguments[1], fields = arguments[2];
+var containers = [];
+if (by === 'xpath') {
+    var res = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (var i = 0; i < res.snapshotLength; i++) { containers.push(res.snapshotItem(i)); }
+} else {
+    var css = value;
+    if (by === 'class name') { css = '.' + value; }
+    else if (by === 'id') { css = '#' + CSS.escape(value); }
+    else if (by === 'name') { css = '[name="' + value + '"]'; }
+    containers = Array.prototype.slice.call(document.querySelectorAll(css));
+}
+var isVisible = function (el) {
+    if (!el || !el.getClientRects().length) { return false; }
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+};
+return containers.map(function (el, index) {
+    var record = {index: index, id: el.id || null, visible: isVisible(el)};
+    Object.keys(fields).forEach(function (name) {
+        var selector = fields[name][0], attribute = fields[name][1];
+        var target = selector ? el.querySelector(selector) : el;
+        if (!target) { record[name] = null; }
+        else if (attribute === 'text') { record[name] = (target.innerText || target.textContent || '').trim(); }
+        else if (attribute === 'class') { record[name] = target.className || ''; }
+        else { record[name] = target.getAttribute(attribute); }
+    });
+    return record;
+});
+"""
+
 
 class BasePage:
     """Base class for all page objects."""
     
+    # Locator strategies whose click is expected to change the page
+    NAVIGATING_LOCATORS = (By.LINK_TEXT, By.PARTIAL_LINK_TEXT)
+    
+    # Locator strategies _SNAPSHOT_SCRIPT can resolve (tag names are valid CSS)
+    SNAPSHOT_LOCATORS = (By.XPATH, By.CSS_SELECTOR, By.CLASS_NAME, By.ID, By.NAME, By.TAG_NAME)
+    
     def __init__(self, driver):
+        from selenium.webdriver.support.ui import WebDriverWait
+        
         self.driver = driver
         self.wait = WebDriverWait(driver, Config.EXPLICIT_WAIT)
+        # Platform bucket for measurements; drivers from DriverFactory carry their own
+        self.platform = getattr(driver, "platform_name", None) or Config.get_platform_name()
+        
+        # Element handle cache: (by, value) -> (element, resolved_as_clickable)
+        self._element_cache: Dict[Tuple[str, str], Tuple["WebElement", bool]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Element cache hit/miss counters for this page object."""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._element_cache),
+        }
+    
+    def invalidate_cache(self, by: By = None, value: str = None):
+        """Drop one cached locator, or the whole cache when no locator is given."""
+        if by is None:
+            self._element_cache.clear()
+        else:
+            self._element_cache.pop((by, value), None)
     
     def navigate_to(self, url: str = None):
         """Navigate to specified URL or base URL."""
         url = url or Config.BASE_URL
         logger.info(f"Navigating to: {url}")
+        self.invalidate_cache()
         self.driver.get(url)
     
+    def _cached_element(self, by: By, value: str, clickable: bool) -> Optional["WebElement"]:
+        """
+        Return a cached handle for the locator, counting the hit or miss.
+        
+        The handle is checked before it is handed out: a stale handle, or one
+        wanted as clickable that is no longer displayed and enabled, is
+        evicted so the caller re-resolves the locator.
+        """
+        entry = self._element_cache.get((by, value))
+        if entry and (entry[1] or not clickable):
+            element = entry[0]
+            try:
+                if clickable:
+                    valid = element.is_displayed() and element.is_enabled()
+                else:
+                    element.is_enabled()  # Raises if the handle went stale
+                    valid = True
+            except StaleElementReferenceException:
+                valid = False
+            if valid:
+                self.cache_hits += 1
+                _cache_counts["hits"] += 1
+                logger.debug(f"Element cache hit: {by}={value}")
+                return element
+            logger.debug(f"Cached element no longer usable, re-resolving: {by}={value}")
+            self.invalidate_cache(by, value)
+        self.cache_misses += 1
+        _cache_counts["misses"] += 1
+        return None
+    
+    def _timed_wait(self, condition, by: By, value: str, timeout: float = None):
+        """
+        Wait for a locator condition using learned timeout and poll values.
+        
+        Resolve times are fed back into the wait engine, keyed by condition
+        and locator. When a learned timeout runs out, the wait is extended
+        once by the same amount, capped at Config.EXPLICIT_WAIT; an element
+        found in the extension is recorded, so later runs learn a longer
+        timeout. An explicit ``timeout`` overrides the learned value and is
+        not extended.
+        """
+        from selenium.webdriver.support.ui import WebDriverWait
+        
+        engine = get_wait_engine()
+        key = f"{condition.__name__}:{by}={value}"
+        learned = timeout is None
+        timeout = timeout or engine.timeout_for(key, self.platform)
+        poll = engine.poll_for(key, self.platform)
+        start = time.monotonic()
+        try:
+            element = WebDriverWait(self.driver, timeout, poll_frequency=poll).until(condition((by, value)))
+        except TimeoutException:
+            extension = min(timeout, Config.EXPLICIT_WAIT - (time.monotonic() - start))
+            if not learned or extension <= 0:
+                engine.record_timeout(key, self.platform)
+                raise
+            logger.warning(f"Learned wait of {timeout:.1f}s for {key} timed out; extending by {extension:.1f}s")
+            try:
+                element = WebDriverWait(self.driver, extension, poll_frequency=poll).until(condition((by, value)))
+            except TimeoutException:
+                engine.record_timeout(key, self.platform)
+                raise
+        engine.record(key, time.monotonic() - start, self.platform)
+        return element
+    
     def find_element(self, by: By, value: str, timeout: int = None):
         """Find element with explicit wait."""
-        timeout = timeout or Config.EXPLICIT_WAIT
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        element = self._cached_element(by, value, clickable=False)
+        if element is not None:
+            return element
+        
         try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((by, value))
-            )
+            element = self._timed_wait(EC.presence_of_element_located, by, value, timeout)
+            self._element_cache[(by, value)] = (element, False)
             return element
         except TimeoutException:
             logger.error(f"Element not found: {by}={value}")
@@ -38,11 +242,15 @@ class BasePage:
     
     def find_clickable_element(self, by: By, value: str, timeout: int = None):
         """Find clickable element with explicit wait."""
-        timeout = timeout or Config.EXPLICIT_WAIT
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        element = self._cached_element(by, value, clickable=True)
+        if element is not None:
+            return element
+        
         try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable((by, value))
-            )
+            element = self._timed_wait(EC.element_to_be_clickable, by, value, timeout)
+            self._element_cache[(by, value)] = (element, True)
             return element
         except TimeoutException:
             logger.error(f"Clickable element not found: {by}={value}")
@@ -52,48 +260,168 @@ class BasePage:
         """Find multiple elements."""
         return self.driver.find_elements(by, value)
     
-    def click_element(self, by: By, value: str, timeout: int = None):
-        """Find and click element."""
-        element = self.find_clickable_element(by, value, timeout)
+    def snapshot_elements(self, by: By, value: str,
+                          fields: Dict[str, Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        Capture structured records for all matching containers in one command.
+        
+        Args:
+            by: Container locator strategy
+            value: Container locator value
+            fields: Mapping of record key to (css selector relative to the
+                container, attribute), where attribute is "text", "class" or a
+                DOM attribute name. An empty selector targets the container.
+                
+        Returns:
+            List of dicts with ``index``, ``id``, ``visible`` and one key per field
+            
+        Raises:
+            ValueError: If the locator strategy is not one of SNAPSHOT_LOCATORS
+        """
+        if by not in self.SNAPSHOT_LOCATORS:
+            raise ValueError(f"snapshot_elements does not support locator strategy '{by}'")
+        records = self.driver.execute_script(_SNAPSHOT_SCRIPT, by, value, fields or {})
+        logger.debug(f"Snapshot of {by}={value}: {len(records)} containers")
+        return records
+    
+    def _with_element(self, by: By, value: str, action: Callable[["WebElement"], Any],
+                      timeout: int = None, clickable: bool = False):
+        """
+        Run an action against a (possibly cached) element.
+        
+        A cached handle that has gone stale is evicted and the locator is
+        re-resolved once before the action is retried.
+        """
+        finder = self.find_clickable_element if clickable else self.find_element
+        element = finder(by, value, timeout)
+        try:
+            return action(element)
+        except StaleElementReferenceException:
+            logger.debug(f"Stale element, re-resolving: {by}={value}")
+            self.invalidate_cache(by, value)
+            return action(finder(by, value, timeout))
+    
+    def click_element(self, by: By, value: str, timeout: int = None, navigates: bool = None):
+        """
+        Find and click element.
+        
+        Args:
+            by: Locator strategy
+            value: Locator value
+            timeout: Explicit wait timeout in seconds
+            navigates: Whether the click changes the page and should clear the
+                element cache. Defaults to True for link-text locators.
+        """
         logger.debug(f"Clicking element: {by}={value}")
-        element.click()
+        self._with_element(by, value, lambda element: element.click(), timeout, clickable=True)
+        
+        if navigates is None:
+            navigates = by in self.NAVIGATING_LOCATORS
+        if navigates:
+            self.invalidate_cache()
     
     def enter_text(self, by: By, value: str, text: str, timeout: int = None):
         """Find element and enter text."""
-        element = self.find_element(by, value, timeout)
-        element.clear()
-        element.send_keys(text)
+        def _type(element):
+            element.clear()
+            element.send_keys(text)
+        
+        self._with_element(by, value, _type, timeout)
         logger.debug(f"Entered text in element: {by}={value}")
     
-    def is_element_visible(self, by: By, value: str, timeout: int = 5):
-        """Check if element is visible."""
+    def is_element_visible(self, by: By, value: str, timeout: float = None) -> bool:
+        """
+        Check if element becomes visible, within the short negative-check budget.
+        
+        A miss is an answer rather than a failure, so the check neither waits
+        out a lookup timeout nor feeds the wait engine's history.
+        """
+        from selenium.webdriver.support import expected_conditions as EC
+        
         try:
-            WebDriverWait(self.driver, timeout).until(
+            DriverFactory.wait_policy.negative_wait(self.driver, timeout).until(
                 EC.visibility_of_element_located((by, value))
             )
             return True
         except TimeoutException:
             return False
     
+    def is_element_absent(self, by: By, value: str, timeout: float = None) -> bool:
+        """Check that element is not visible, within the short negative-check budget."""
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        try:
+            DriverFactory.wait_policy.negative_wait(self.driver, timeout).until(
+                EC.invisibility_of_element_located((by, value))
+            )
+            return True
+        except TimeoutException:
+            return False
+    
     def wait_for_element_to_disappear(self, by: By, value: str, timeout: int = None):
         """Wait for element to disappear."""
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+        
         timeout = timeout or Config.EXPLICIT_WAIT
+        self.invalidate_cache(by, value)
         WebDriverWait(self.driver, timeout).until(
             EC.invisibility_of_element_located((by, value))
         )
     
+    def wait_until_settled(self, quiet_ms: int = None, timeout: int = None) -> bool:
+        """
+        Wait until the DOM and network have been quiet for a window.
+        
+        Replaces fixed sleeps after clicks and navigation: a single async
+        script call returns as soon as no mutations or fetch/XHR requests
+        have been seen for ``quiet_ms``. Requests already in flight when the
+        hooks are first installed on a document are not counted, so the
+        readiness state is checked as well.
+        
+        Args:
+            quiet_ms: Quiet window in milliseconds. Defaults to Config.SETTLE_QUIET_MS.
+            timeout: Maximum time to wait in seconds. Defaults to Config.SETTLE_TIMEOUT.
+            
+        Returns:
+            bool: True if the page settled, False if the timeout elapsed first
+        """
+        quiet_ms = quiet_ms or Config.SETTLE_QUIET_MS
+        timeout = timeout or Config.SETTLE_TIMEOUT
+        try:
+            result = self.driver.execute_async_script(_SETTLE_SCRIPT, quiet_ms, timeout * 1000)
+        except TimeoutException:
+            logger.warning(f"Settle wait exceeded the script timeout after {timeout}s")
+            return False
+        
+        if not result.get("settled"):
+            logger.warning(
+                f"Page did not settle within {timeout}s "
+                f"({result.get('inflight')} requests in flight)"
+            )
+            return False
+        
+        logger.debug(f"Page settled after {result.get('elapsed')}ms")
+        return True
+    
+    def recover_step(self):
+        """Drop cached element handles and let the page settle before a step is retried."""
+        self.invalidate_cache()
+        self.wait_until_settled()
+    
     def get_element_text(self, by: By, value: str, timeout: int = None):
         """Get text from element."""
-        element = self.find_element(by, value, timeout)
-        return element.text
+        return self._with_element(by, value, lambda element: element.text, timeout)
     
     def scroll_to_element(self, element):
         """Scroll element into view."""
         self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
     
     def take_screenshot(self, name: str):
-        """Take a screenshot."""
-        screenshot_path = Config.SCREENSHOTS_DIR / f"{name}.png"
-        self.driver.save_screenshot(str(screenshot_path))
-        logger.info(f"Screenshot saved: {screenshot_path}")
-        return screenshot_path
\ No newline at end of file
+        """
+        Take a screenshot; the file is written in the background.
+        
+        The returned path may not exist yet, or at all if the build's
+        screenshot budget is used up.
+        """
+        return get_screenshot_service().capture(self.driver, name)
\ No newline at end of file
@@ -14,4 +14,25 @@ class FavoritesPage(BasePage):
     # Locators
     FAVORITE_PRODUCTS = (By.CLASS_NAME, "shelf-item")
     PRODUCT_TITLE = (By.CLASS_NAME, "shelf-item__title")
-    EMPTY_FAVORITES_MSG = (By.XPATH, "//p[contains(text(),
\ No newline at end of file
+    EMPTY_FAVORITES_MSG = (By.XPATH, "//p[contains(text(),'favourite')]")
+    
+    # Fields captured per favorite container by snapshot_elements
+    PRODUCT_FIELDS = {
+        "title": (".shelf-item__title", "text"),
+        "price": (".shelf-item__price .val", "text"),
+    }
+    
+    def get_favorite_product_names(self):
+        """Get names of all visible favorite products."""
+        records = self.snapshot_elements(*self.FAVORITE_PRODUCTS, fields=self.PRODUCT_FIELDS)
+        return [r["title"] for r in records if r["visible"]]
+    
+    def is_product_in_favorites(self, product_name: str):
+        """Check if a specific product is listed in favorites."""
+        product_names = self.get_favorite_product_names()
+        logger.info(f"Favorite products: {product_names}")
+        return product_name in product_names
+    
+    def is_favorites_empty(self):
+        """Check if the favorites list is empty, allowing a removal a moment to apply."""
+        return self.is_element_absent(*self.FAVORITE_PRODUCTS) and not self.get_favorite_product_names()
@@ -1,14 +1,80 @@
-"""Products page object for BStackDemo."""
+"""Login and products page objects for BStackDemo."""
 
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
+from typing import Any, Dict, List
 import logging
-import time
 
+from ..config.config import Config
+from ..utils.auth_snapshot import AuthSnapshot, get_auth_store
+from ..utils.steps import step
 from .base_page import BasePage
 
 logger = logging.getLogger(__name__)
 
 
+class LoginPage(BasePage):
+    """Page object for the sign-in page."""
+    
+    # Locators
+    USERNAME_DROPDOWN = (By.ID, "username")
+    PASSWORD_DROPDOWN = (By.ID, "password")
+    LOGIN_BUTTON = (By.ID, "login-btn")
+    LOGGED_IN_USERNAME = (By.CLASS_NAME, "username")
+    
+    SIGNIN_PATH = "/signin"
+    
+    def login(self, username: str = None, password: str = None, use_snapshot: bool = None):
+        """
+        Log in, restoring a captured session instead of using the UI when possible.
+        
+        A snapshot that no longer logs the user in is discarded and replaced
+        by a fresh UI login.
+        """
+        username = username or Config.TEST_USERNAME
+        password = password or Config.TEST_PASSWORD
+        if use_snapshot is None:
+            use_snapshot = Config.AUTH_SNAPSHOTS
+        platform = self.platform
+        store = get_auth_store()
+        
+        snapshot = store.get(platform, username) if use_snapshot else None
+        if snapshot:
+            snapshot.restore(self.driver)
+            self.invalidate_cache()
+            if self.is_logged_in(username):
+                logger.info(f"Restored login snapshot for {username}")
+                return
+            logger.warning(f"Login snapshot for {username} was rejected, logging in via UI")
+            store.invalidate(platform, username)
+        
+        self.login_via_ui(username, password)
+        if use_snapshot:
+            store.put(platform, username, AuthSnapshot.capture(self.driver))
+    
+    def login_via_ui(self, username: str, password: str):
+        """Log in through the sign-in form."""
+        logger.info(f"Logging in as {username}")
+        self.navigate_to(f"{Config.BASE_URL}{self.SIGNIN_PATH}")
+        
+        self.click_element(*self.USERNAME_DROPDOWN)
+        self.click_element(By.XPATH, f"//div[text()='{username}']")
+        self.click_element(*self.PASSWORD_DROPDOWN)
+        self.click_element(By.XPATH, f"//div[text()='{password}']")
+        self.click_element(*self.LOGIN_BUTTON, navigates=True)
+        
+        self.wait_until_settled()
+        if not self.is_logged_in(username):
+            raise Exception(f"Login failed for {username}")
+    
+    def is_logged_in(self, username: str = None) -> bool:
+        """Check whether the header shows the logged-in user."""
+        self.wait_until_settled()
+        if not self.is_element_visible(*self.LOGGED_IN_USERNAME):
+            return False
+        return username is None or self.get_element_text(*self.LOGGED_IN_USERNAME) == username
+
+
 class ProductsPage(BasePage):
     """Page object for products listing and filtering."""
     
@@ -27,55 +93,75 @@ class ProductsPage(BasePage):
     
     FAVORITES_LINK = (By.LINK_TEXT, "Favourites")
     
+    # Fields captured per product container by snapshot_elements
+    PRODUCT_FIELDS = {
+        "title": (".shelf-item__title", "text"),
+        "price": (".shelf-item__price .val", "text"),
+        "favorite_class": (".shelf-stopper button", "class"),
+    }
+    
     def filter_by_brand(self, brand: str):
         """Apply brand filter."""
         logger.info(f"Filtering by brand: {brand}")
         
         brand_lower = brand.lower()
         if brand_lower == "samsung":
-            self.click_element(*self.SAMSUNG_FILTER)
+            self._click_filter(self.SAMSUNG_FILTER)
         elif brand_lower == "apple":
-            self.click_element(*self.APPLE_FILTER)
+            self._click_filter(self.APPLE_FILTER)
         elif brand_lower == "google":
-            self.click_element(*self.GOOGLE_FILTER)
+            self._click_filter(self.GOOGLE_FILTER)
         elif brand_lower == "oneplus":
-            self.click_element(*self.ONEPLUS_FILTER)
+            self._click_filter(self.ONEPLUS_FILTER)
         else:
             raise ValueError(f"Unknown brand: {brand}")
         
         # Wait for products to filter
-        time.sleep(2)
+        self.wait_until_settled()
     
     def filter_by_samsung(self):
         """Apply Samsung filter."""
         self.filter_by_brand("Samsung")
     
+    def get_product_snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Get structured records for every product container in one command.
+        
+        Each record has ``id``, ``title``, ``price``, ``favorited`` and ``visible``.
+        """
+        records = self.snapshot_elements(*self.PRODUCT_CONTAINER, fields=self.PRODUCT_FIELDS)
+        for record in records:
+            record["favorited"] = "clicked" in (record.pop("favorite_class") or "").split()
+        return records
+    
     def get_all_product_names(self):
         """Get names of all visible products."""
-        products = self.find_elements(*self.PRODUCT_TITLE)
-        return [p.text for p in products]
+        return [p["title"] for p in self.get_product_snapshot() if p["visible"]]
     
     def is_product_displayed(self, product_name: str):
         """Check if a specific product is displayed."""
         product_names = self.get_all_product_names()
         return product_name in product_names
     
+    @step("Click product favorite")
     def favorite_product_by_name(self, product_name: str):
-        """Add a product to favorites by its name."""
+        """Add a product to favorites by its name; the step retries the lookup and click."""
         logger.info(f"Adding {product_name} to favorites")
         
-        # Find all product containers
-        products = self.find_elements(*self.PRODUCT_CONTAINER)
-        
-        for product in products:
-            title_element = product.find_element(By.CLASS_NAME, "shelf-item__title")
-            if title_element.text == product_name:
-                # Find and click the favorite button within this product
-                favorite_btn = product.find_element(By.TAG_NAME, "button")
-                self.scroll_to_element(favorite_btn)
-                favorite_btn.click()
-                logger.info(f"Clicked favorite for {product_name}")
-                return
+        for product in self.get_product_snapshot():
+            if product["title"] != product_name:
+                continue
+            
+            # Find and click the favorite button within this product
+            if product["id"]:
+                favorite_btn = self.find_clickable_element(By.CSS_SELECTOR, f"[id='{product['id']}'] button")
+            else:
+                container = self.find_elements(*self.PRODUCT_CONTAINER)[product["index"]]
+                favorite_btn = container.find_element(By.TAG_NAME, "button")
+            self.scroll_to_element(favorite_btn)
+            favorite_btn.click()
+            logger.info(f"Clicked favorite for {product_name}")
+            return
         
         raise Exception(f"Product not found: {product_name}")
     
@@ -85,18 +171,31 @@ class ProductsPage(BasePage):
         
         # Method 1: Try specific ID selector
         try:
-            self.click_element(*self.GALAXY_S20_FAVORITE_BTN)
-            return
-        except:
+            self._click_galaxy_s20_favorite()
+        except WebDriverException:
+            # Method 2: Fallback to name-based selection
             logger.warning("Failed with ID selector, trying by name")
+            self.favorite_product_by_name("Galaxy S20+")
         
-        # Method 2: Fallback to name-based selection
-        self.favorite_product_by_name("Galaxy S20+")
+        self.wait_until_settled()
     
     def navigate_to_favorites(self):
         """Navigate to favorites page."""
         logger.info("Navigating to favorites")
-        self.click_element(*self.FAVORITES_LINK)
+        self._click_favorites_link()
         
         # Wait for navigation
-        time.sleep(1)
\ No newline at end of file
+        self.wait_until_settled()
+    
+    # Steps retry only the locate-and-click, never the settle wait after it
+    @step("Click brand filter")
+    def _click_filter(self, locator):
+        self.click_element(*locator)
+    
+    @step("Click Galaxy S20+ favorite")
+    def _click_galaxy_s20_favorite(self):
+        self.click_element(*self.GALAXY_S20_FAVORITE_BTN)
+    
+    @step("Click Favourites link")
+    def _click_favorites_link(self):
+        self.click_element(*self.FAVORITES_LINK)
\ No newline at end of file
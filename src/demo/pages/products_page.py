@@ -1,11 +1,15 @@
 """Products page object model for Demo test suite - using Playwright-style selectors."""
 
-import time
+import logging
+
+from selenium.common.exceptions import ElementClickInterceptedException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
 
+from ..utils.steps import step
 from .base_page import BasePage
 
+logger = logging.getLogger(__name__)
+
 
 class ProductsPage(BasePage):
     """Products page object model for Demo."""
@@ -18,52 +22,54 @@ class ProductsPage(BasePage):
     
     def filter_by_samsung(self) -> None:
         """Click Samsung filter."""
-        self.logger.info("[Demo] Filtering products by Samsung")
+        logger.info("[Demo] Filtering products by Samsung")
         
-        # Click Samsung text to filter
-        samsung_element = self.wait.until(EC.element_to_be_clickable(self.SAMSUNG_FILTER))
-        samsung_element.click()
+        self._click_samsung_filter()
         
-        time.sleep(2)  # Wait for filter to apply
-        self.logger.info("[Demo] Samsung filter applied")
+        self.wait_until_settled()  # Wait for filter to apply
+        logger.info("[Demo] Samsung filter applied")
     
     def favorite_galaxy_s20_plus(self) -> None:
         """Click favorite button for Galaxy S20+ (id=11)."""
-        self.logger.info("[Demo] Adding Galaxy S20+ to favorites")
-        
-        # Find the favorite button for product id="11"
-        favorite_btn = self.wait.until(EC.element_to_be_clickable(self.GALAXY_S20_FAVORITE_BUTTON))
+        logger.info("[Demo] Adding Galaxy S20+ to favorites")
         
-        # Scroll to element to ensure it's in the viewport
-        self.driver.execute_script("arguments[0].scrollIntoView(true);", favorite_btn)
-        time.sleep(1) # Small pause after scrolling
-        
-        # === JS CLICK FIX APPLIED HERE ===
-        # Instead of favorite_btn.click(), use JavaScript to click the element
-        self.logger.info("[Demo] Executing JavaScript click for Galaxy S20+ favorite button.")
-        self.driver.execute_script("arguments[0].click();", favorite_btn)
+        try:
+            self._click_galaxy_s20_favorite()
+        except ElementClickInterceptedException:
+            # Still covered after the step's retries; a JavaScript click is not intercepted
+            logger.info("[Demo] Executing JavaScript click for Galaxy S20+ favorite button.")
+            favorite_btn = self.find_clickable_element(*self.GALAXY_S20_FAVORITE_BUTTON)
+            self.driver.execute_script("arguments[0].click();", favorite_btn)
         
-        time.sleep(1)  # Wait for favorite action to register
-        self.logger.info("[Demo] Galaxy S20+ added to favorites")
+        self.wait_until_settled()  # Wait for favorite action to register
+        logger.info("[Demo] Galaxy S20+ added to favorites")
     
     def navigate_to_favorites(self) -> None:
         """Click Favourites link."""
-        self.logger.info("[Demo] Navigating to favorites page")
+        logger.info("[Demo] Navigating to favorites page")
         
-        favorites_link = self.wait.until(EC.element_to_be_clickable(self.FAVORITES_LINK))
-        favorites_link.click()
+        self._click_favorites_link()
         
-        time.sleep(2)  # Wait for page load
-        self.logger.info("[Demo] Navigated to favorites page")
+        self.wait_until_settled()  # Wait for page load
+        logger.info("[Demo] Navigated to favorites page")
+    
+    # Steps retry only the locate-and-click, never the settle wait after it
+    @step("Click Samsung filter")
+    def _click_samsung_filter(self) -> None:
+        self.click_element(*self.SAMSUNG_FILTER)
+    
+    @step("Click Galaxy S20+ favorite")
+    def _click_galaxy_s20_favorite(self) -> None:
+        favorite_btn = self.find_clickable_element(*self.GALAXY_S20_FAVORITE_BUTTON)
+        
+        # Centre the button so fixed page elements are less likely to cover it
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", favorite_btn)
+        favorite_btn.click()
+    
+    @step("Click Favourites link")
+    def _click_favorites_link(self) -> None:
+        self.click_element(*self.FAVORITES_LINK)
     
     def is_product_displayed(self, product_name: str) -> bool:
         """Check if product is displayed on page."""
-        try:
-            # Note: For robust checks, consider using wait.until for visibility
-            product_element = self.driver.find_element(By.XPATH, f"//p[text()='{product_name}']")
-            return product_element.is_displayed()
-        except:
-            # It's generally better to catch specific exceptions like NoSuchElementException
-            # and log them, rather than a bare 'except'.
-            return False
-
+        return self.is_element_visible(By.XPATH, f"//p[text()='{product_name}']")
@@ -0,0 +1,113 @@
+"""Authenticated-state snapshots that let tests skip the UI login."""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import WebDriverException
+
+from ..config.config import Config
+
+logger = logging.getLogger(__name__)
+
+_CAPTURE_STORAGE_SCRIPT = """
+return {
+    local: Object.assign({}, window.localStorage),
+    session: Object.assign({}, window.sessionStorage)
+};
+"""
+
+_RESTORE_STORAGE_SCRIPT = """
+var local = arguments[0], session = arguments[1];
+window.localStorage.clear();
+window.sessionStorage.clear();
+Object.keys(local).forEach(function (k) { window.localStorage.setItem(k, local[k]); });
+Object.keys(session).forEach(function (k) { window.sessionStorage.setItem(k, session[k]); });
+"""
+
+# Cookie fields accepted by WebDriver's Add Cookie command
+_COOKIE_FIELDS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+
+class AuthSnapshot:
+    """Cookies plus localStorage/sessionStorage captured after a login."""
+    
+    def __init__(self, cookies: List[Dict[str, Any]], local_storage: Dict[str, str],
+                 session_storage: Dict[str, str], captured_at: float = None):
+        self.cookies = cookies
+        self.local_storage = local_storage
+        self.session_storage = session_storage
+        self.captured_at = captured_at or time.time()
+    
+    @property
+    def expired(self) -> bool:
+        """Whether the snapshot is older than the TTL or has an expired cookie."""
+        now = time.time()
+        if now - self.captured_at > Config.AUTH_SNAPSHOT_TTL:
+            return True
+        return any(c.get("expiry") is not None and c["expiry"] <= now for c in self.cookies)
+    
+    @classmethod
+    def capture(cls, driver) -> "AuthSnapshot":
+        """Capture the logged-in state of the current origin."""
+        storage = driver.execute_script(_CAPTURE_STORAGE_SCRIPT)
+        return cls(driver.get_cookies(), storage["local"], storage["session"])
+    
+    def restore(self, driver, url: str = None):
+        """
+        Inject the snapshot into a session and load the page.
+        
+        The origin is loaded first because cookies and web storage can only
+        be set for the current document; the page is then reloaded so the
+        app starts with the restored state.
+        """
+        url = url or Config.BASE_URL
+        driver.get(url)
+        driver.delete_all_cookies()
+        for cookie in self.cookies:
+            try:
+                driver.add_cookie({k: v for k, v in cookie.items() if k in _COOKIE_FIELDS})
+            except WebDriverException as e:
+                logger.debug(f"Skipping cookie {cookie.get('name')}: {e}")
+        driver.execute_script(_RESTORE_STORAGE_SCRIPT, self.local_storage, self.session_storage)
+        driver.get(url)
+
+
+class AuthSnapshotStore:
+    """Per-process snapshots keyed by platform and username."""
+    
+    def __init__(self):
+        self._snapshots: Dict[Tuple[str, str], AuthSnapshot] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, platform: str, username: str) -> Optional[AuthSnapshot]:
+        """Get a usable snapshot, dropping it if it has expired."""
+        with self._lock:
+            snapshot = self._snapshots.get((platform, username))
+            if snapshot and snapshot.expired:
+                logger.info(f"Auth snapshot for {username} on {platform} expired")
+                del self._snapshots[(platform, username)]
+                snapshot = None
+            return snapshot
+    
+    def put(self, platform: str, username: str, snapshot: AuthSnapshot):
+        """Store a freshly captured snapshot."""
+        with self._lock:
+            self._snapshots[(platform, username)] = snapshot
+    
+    def invalidate(self, platform: str, username: str):
+        """Forget a snapshot that no longer logs the user in."""
+        with self._lock:
+            self._snapshots.pop((platform, username), None)
+
+
+_store: Optional[AuthSnapshotStore] = None
+
+
+def get_auth_store() -> AuthSnapshotStore:
+    """Get the process-wide auth snapshot store, creating it on first use."""
+    global _store
+    if _store is None:
+        _store = AuthSnapshotStore()
+    return _store
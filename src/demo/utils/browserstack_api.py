@@ -1,124 +1,269 @@
 """BrowserStack REST API helper for updating test session status."""
 
 import requests
+import json
 import logging
+import math
 import os
-import time
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..config.config import Config
+from .rate_limiter import get_rate_limiter
+from .transport_stats import TransportStats, counting_pool_classes
+
+# Downloadable session artifacts: file name -> session details field holding its URL
+ARTIFACT_URL_FIELDS = {
+    "text.log": "logs",
+    "network.har": "har_logs_url",
+    "console.log": "browser_console_logs_url",
+}
+
+# BrowserStack hosts that serve artifacts behind the account's basic auth; other hosts
+# (e.g. pre-signed storage URLs) never receive credentials
+AUTHENTICATED_ARTIFACT_HOSTS = {"api.browserstack.com", "api-cloud.browserstack.com", "automate.browserstack.com"}
+
+# Process-wide HTTP sessions (per API base URL and retry policy) shared by BrowserStackAPI instances
+_sessions: Dict[Tuple[str, bool], requests.Session] = {}
+_session_lock = threading.Lock()
+_stats = TransportStats()
+
+
+class StatusAwareRetry(Retry):
+    """
+    Retry policy with backoff that depends on the failing status.
+    
+    - 429: Retry-After is honoured when present; otherwise backoff starts
+      at RATE_LIMIT_BACKOFF and doubles. The pause is applied to the shared
+      rate limiter, so every process waits, not just this one.
+    - 404 (only retried for sessions that were just created): a constant
+      NEW_SESSION_BACKOFF, since the API lists a new session after a few
+      seconds however often it is asked.
+    - 5xx and connection errors: exponential backoff from backoff_factor.
+    
+    Every retry also takes a token from the shared rate limiter.
+    """
+    
+    RATE_LIMIT_BACKOFF = 5.0
+    NEW_SESSION_BACKOFF = 2.0
+    
+    def get_backoff_time(self) -> float:
+        if not self.history or self.history[-1].status is None:
+            return super().get_backoff_time()
+        
+        status = self.history[-1].status
+        if status == 404:
+            return self.NEW_SESSION_BACKOFF
+        if status == 429:
+            consecutive = 0
+            for attempt in reversed(self.history):
+                if attempt.status != 429:
+                    break
+                consecutive += 1
+            return min(self.RATE_LIMIT_BACKOFF * 2 ** (consecutive - 1), self.DEFAULT_BACKOFF_MAX)
+        return super().get_backoff_time()
+    
+    def sleep(self, response=None):
+        limiter = get_rate_limiter()
+        if limiter and response is not None and response.status == 429:
+            retry_after = self.get_retry_after(response) if self.respect_retry_after_header else None
+            limiter.block(retry_after if retry_after is not None else self.get_backoff_time())
+        else:
+            super().sleep(response)
+        if limiter:
+            limiter.acquire()
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools report connection reuse to the shared stats."""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = counting_pool_classes(_stats)
+
+
+def _build_retry(new_session: bool = False) -> StatusAwareRetry:
+    """
+    Build the retry policy for rate limits, server errors and connection errors.
+    
+    With ``new_session`` a 404 is retried as well, for up to
+    Config.BROWSERSTACK_SESSION_WAIT seconds, while the API catches up with
+    a session that was just created.
+    """
+    statuses = {429, 500, 502, 503, 504}
+    total = Config.BROWSERSTACK_API_RETRIES
+    if new_session:
+        statuses.add(404)
+        total = max(total, math.ceil(Config.BROWSERSTACK_SESSION_WAIT / StatusAwareRetry.NEW_SESSION_BACKOFF))
+    return StatusAwareRetry(
+        total=total,
+        status_forcelist=statuses,
+        allowed_methods={"GET", "PUT"},
+        backoff_factor=1.0,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def get_http_session(base_url: str, new_session: bool = False) -> requests.Session:
+    """
+    Get the process-wide pooled HTTP session for a BrowserStack API base URL.
+    
+    Only the ``new_session`` session retries a 404, for calls about a session
+    this run just created; lookups of missing sessions otherwise fail fast.
+    """
+    key = (base_url, new_session)
+    with _session_lock:
+        if key not in _sessions:
+            session = requests.Session()
+            session.mount(f"{base_url}/", _CountingAdapter(
+                pool_connections=1, pool_maxsize=Config.BROWSERSTACK_API_POOL_SIZE,
+                max_retries=_build_retry(new_session)))
+            _sessions[key] = session
+        return _sessions[key]
+
 
 class BrowserStackAPI:
     """Helper class for BrowserStack Automate REST API operations."""
     
-    def __init__(self, username: str = None, access_key: str = None):
+    def __init__(self, username: str = None, access_key: str = None, base_url: str = None):
         """Initialize with BrowserStack credentials."""
-        self.username = username or os.getenv('BROWSERSTACK_USERNAME')
-        self.access_key = access_key or os.getenv('BROWSERSTACK_ACCESS_KEY')
-        self.base_url = "https://api.browserstack.com/automate"
+        self.username = username or Config.BROWSERSTACK_USERNAME
+        self.access_key = access_key or Config.BROWSERSTACK_ACCESS_KEY
+        self.base_url = (base_url or Config.BROWSERSTACK_API_URL).rstrip("/")
         self.logger = logging.getLogger(__name__)
+        self.session = get_http_session(self.base_url)
+        self.new_session = get_http_session(self.base_url, new_session=True)
+        self.auth = (self.username, self.access_key)
         
         # Validate credentials
         if not self.username or not self.access_key:
             self.logger.error("BrowserStack username and access key are required")
-            
-    def wait_for_session(self, session_id: str, max_wait: int = 30) -> bool:
+    
+    @staticmethod
+    def metrics() -> Dict[str, float]:
+        """Get process-wide API call, connection reuse, retry and rate-limit wait counts."""
+        metrics = _stats.as_dict()
+        limiter = get_rate_limiter()
+        if limiter:
+            metrics.update(limiter.metrics())
+        return metrics
+    
+    def _request(self, method: str, url: str, new_session: bool = False, **kwargs) -> requests.Response:
+        """
+        Send a request through the shared session and record metrics.
+        
+        With ``new_session`` the request concerns a session that was just
+        created, and a 404 is retried until the API lists it.
+        """
+        kwargs.setdefault("timeout", 30)
+        limiter = get_rate_limiter()
+        if limiter:
+            limiter.acquire()
+        _stats.add("requests")
+        session = self.new_session if new_session else self.session
+        response = session.request(method, url, auth=self.auth, **kwargs)
+        retries = getattr(response.raw, "retries", None)
+        if retries is not None and retries.history:
+            _stats.add("retries", len(retries.history))
+        
+        # Retries ran out while still rate limited: hold everyone off before the next call
+        if limiter and response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "")
+            limiter.block(float(retry_after) if retry_after.isdigit() else StatusAwareRetry.RATE_LIMIT_BACKOFF)
+        return response
+    
+    def wait_for_session(self, session_id: str) -> bool:
         """
         Wait for session to be available on BrowserStack.
         
+        A freshly created session takes a few seconds to appear in the API;
+        the lookup's 404s are retried for up to Config.BROWSERSTACK_SESSION_WAIT.
+        
         Args:
             session_id: The BrowserStack session ID
-            max_wait: Maximum time to wait in seconds
-            
+        
         Returns:
             bool: True if session is available, False otherwise
         """
         if not session_id:
             return False
-            
-        start_time = time.time()
-        while time.time() - start_time < max_wait:
-            if self.get_session_details(session_id):
-                self.logger.info(f"Session {session_id} is now available on BrowserStack")
-                return True
-            time.sleep(2)
-            
-        self.logger.warning(f"Session {session_id} not found after {max_wait} seconds")
-        return False
         
-    def update_session_status(self, session_id: str, status: str, reason: str, retry_count: int = 3) -> bool:
+        url = f"{self.base_url}/sessions/{session_id}.json"
+        try:
+            response = self._request("GET", url, new_session=True)
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error waiting for session {session_id}: {e}")
+            return False
+        
+        if response.status_code == 200:
+            self.logger.info(f"Session {session_id} is now available on BrowserStack")
+            return True
+        self.logger.warning(
+            f"Session {session_id} not found after {Config.BROWSERSTACK_SESSION_WAIT} seconds "
+            f"(status code {response.status_code})"
+        )
+        return False
+    
+    def update_session_status(self, session_id: str, status: str, reason: str) -> bool:
         """
-        Update the status of a BrowserStack session using REST API with retry logic.
+        Update the status of a BrowserStack session using REST API.
+        
+        The update is sent with the new-session retry policy: rate limits
+        and server errors are retried, and so is a 404 while the API does
+        not list the session yet.
         
         Args:
             session_id: The BrowserStack session ID
             status: "passed" or "failed"
             reason: Reason for the status
-            retry_count: Number of retry attempts
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
         if not session_id:
             self.logger.error("Session ID is required")
             return False
-            
+        
         if not self.username or not self.access_key:
             self.logger.error("BrowserStack credentials not configured")
             return False
-            
-        # Wait for session to be available first
-        if not self.wait_for_session(session_id):
-            self.logger.error(f"Session {session_id} not found on BrowserStack")
-            return False
-            
+        
         url = f"{self.base_url}/sessions/{session_id}.json"
         data = {
             "status": status,
             "reason": reason
         }
         
-        for attempt in range(retry_count):
-            try:
-                self.logger.info(f"Attempting to update session {session_id} (attempt {attempt + 1}/{retry_count})")
-                
-                response = requests.put(
-                    url,
-                    json=data,
-                    auth=(self.username, self.access_key),
-                    headers={"Content-Type": "application/json"},
-                    timeout=30
-                )
-                
-                if response.status_code == 200:
-                    self.logger.info(f"Successfully updated session {session_id} status to {status}")
-                    return True
-                elif response.status_code == 404:
-                    self.logger.warning(f"Session {session_id} not found (404). Waiting before retry...")
-                    time.sleep(5)  # Wait longer for 404 errors
-                else:
-                    self.logger.error(f"Failed to update session status. Status code: {response.status_code}, Response: {response.text}")
-                    time.sleep(2)
-                    
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"Error updating session status (attempt {attempt + 1}): {e}")
-                if attempt < retry_count - 1:
-                    time.sleep(2)
-                    
-        self.logger.error(f"Failed to update session {session_id} after {retry_count} attempts")
+        try:
+            response = self._request("PUT", url, new_session=True, json=data)
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error updating session {session_id} status: {e}")
+            return False
+        
+        if response.status_code == 200:
+            self.logger.info(f"Successfully updated session {session_id} status to {status}")
+            return True
+        self.logger.error(
+            f"Failed to update session {session_id} status. "
+            f"Status code: {response.status_code}, Response: {response.text}"
+        )
         return False
     
     def get_session_details(self, session_id: str) -> Optional[dict]:
         """Get details of a specific session."""
         if not session_id:
             return None
-            
+        
         url = f"{self.base_url}/sessions/{session_id}.json"
         
         try:
-            response = requests.get(
-                url,
-                auth=(self.username, self.access_key),
-                timeout=30
-            )
+            response = self._request("GET", url)
             
             if response.status_code == 200:
                 return response.json()
@@ -128,34 +273,209 @@ class BrowserStackAPI:
             else:
                 self.logger.error(f"Failed to get session details. Status code: {response.status_code}")
                 return None
-                
+        
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Error getting session details: {e}")
             return None
-            
-    def get_build_sessions(self, build_id: str) -> Optional[list]:
-        """Get all sessions for a specific build."""
+    
+    def iter_build_sessions(self, build_id: str, status: str = None, page_size: int = None) -> Iterator[dict]:
+        """
+        Stream every session of a build, one page at a time.
+        
+        Pages are fetched lazily as the caller iterates. Each page is
+        revalidated against the on-disk build cache with If-None-Match, so
+        an unchanged page costs a 304 instead of a full download.
+        
+        Args:
+            build_id: The BrowserStack build ID
+            status: Optional server-side status filter (e.g. "failed", "done")
+            page_size: Sessions per request. Defaults to Config.BUILD_SESSIONS_PAGE_SIZE.
+        
+        Yields:
+            dict: Session entries as returned by the API
+        
+        Raises:
+            requests.HTTPError: If a page cannot be fetched
+        """
+        page_size = page_size or Config.BUILD_SESSIONS_PAGE_SIZE
         url = f"{self.base_url}/builds/{build_id}/sessions.json"
+        cache = _BuildSessionCache(build_id)
+        offset = 0
         
         try:
-            response = requests.get(
-                url,
-                auth=(self.username, self.access_key),
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                self.logger.error(f"Failed to get build sessions. Status code: {response.status_code}")
-                return None
+            while True:
+                params = {"limit": page_size, "offset": offset}
+                if status:
+                    params["status"] = status
+                key = "&".join(f"{name}={value}" for name, value in sorted(params.items()))
+                cached = cache.get(key)
+                headers = {"If-None-Match": cached["etag"]} if cached else {}
+                
+                response = self._request("GET", url, params=params, headers=headers)
+                if response.status_code == 304 and cached:
+                    self.logger.debug(f"Build {build_id} page {key} unchanged, using cache")
+                    page = cached["sessions"]
+                else:
+                    response.raise_for_status()
+                    page = response.json()
+                    if response.headers.get("ETag"):
+                        cache.put(key, response.headers["ETag"], page)
                 
+                yield from page
+                if len(page) < page_size:
+                    break
+                offset += page_size
+        
+        finally:
+            # Also reached when the caller stops iterating early
+            cache.save()
+    
+    def get_build_sessions(self, build_id: str, status: str = None) -> Optional[list]:
+        """Get all sessions for a specific build."""
+        try:
+            return list(self.iter_build_sessions(build_id, status))
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Error getting build sessions: {e}")
             return None
+    
+    def harvest_artifacts(self, session_ids: Iterable[str] = None, build_id: str = None,
+                          output_dir: Path = None, failed_only: bool = True) -> Dict[str, List[Path]]:
+        """
+        Download logs for sessions of a build or for a list of session IDs.
+        
+        Sessions are processed concurrently on a bounded thread pool. Each
+        gets a directory under ``output_dir`` holding ``details.json`` (which
+        includes the video and dashboard links) and the files named in
+        ARTIFACT_URL_FIELDS. Files already on disk are skipped and partial
+        downloads are resumed.
+        
+        Args:
+            session_ids: Session IDs recorded during a run
+            build_id: Build whose sessions should be harvested
+            output_dir: Destination root. Defaults to Config.ARTIFACTS_DIR.
+            failed_only: Skip sessions whose status is not "failed"
+        
+        Returns:
+            Dict of session ID to downloaded (or already present) artifact paths
+        """
+        output_dir = Path(output_dir or Config.ARTIFACTS_DIR)
+        
+        with ThreadPoolExecutor(max_workers=Config.ARTIFACT_WORKERS) as executor:
+            if build_id:
+                entries = self.iter_build_sessions(build_id, status="failed" if failed_only else None)
+                details = (entry.get("automation_session", entry) for entry in entries)
+            else:
+                details = executor.map(self._session_details_or_none, session_ids or [])
+            
+            futures = {}
+            for session in details:
+                if not session:
+                    continue
+                if failed_only and session.get("status") != "failed":
+                    continue
+                session_id = session["hashed_id"]
+                futures[session_id] = executor.submit(self._harvest_session, session, output_dir / session_id)
+            
+            results = {}
+            for session_id, future in futures.items():
+                try:
+                    results[session_id] = future.result()
+                except (requests.exceptions.RequestException, OSError) as e:
+                    self.logger.error(f"Failed to harvest artifacts for session {session_id}: {e}")
+        
+        self.logger.info(f"Harvested artifacts for {len(results)} sessions into {output_dir}")
+        return results
+    
+    def _session_details_or_none(self, session_id: str) -> Optional[dict]:
+        """Get the automation_session part of a session's details."""
+        details = self.get_session_details(session_id)
+        return details.get("automation_session") if details else None
+    
+    def _harvest_session(self, session: dict, session_dir: Path) -> List[Path]:
+        """Save a session's details and download its artifacts."""
+        session_dir.mkdir(parents=True, exist_ok=True)
+        details_file = session_dir / "details.json"
+        details_file.write_text(json.dumps(session, indent=2))
+        
+        paths = [details_file]
+        for filename, field in ARTIFACT_URL_FIELDS.items():
+            url = session.get(field)
+            if url:
+                paths.append(self.download_artifact(url, session_dir / filename))
+        return paths
+    
+    def download_artifact(self, url: str, path: Path) -> Path:
+        """
+        Stream an artifact to disk, resuming a previous partial download.
+        
+        Data goes to ``<path>.part`` and is renamed once complete, so an
+        existing ``path`` is always a finished download and is skipped.
+        Credentials are only sent to the API host and the BrowserStack hosts
+        in AUTHENTICATED_ARTIFACT_HOSTS.
+        """
+        if path.exists():
+            self.logger.debug(f"Artifact already downloaded: {path}")
+            return path
+        
+        partial = path.with_name(path.name + ".part")
+        offset = partial.stat().st_size if partial.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        
+        kwargs = {"headers": headers, "stream": True, "timeout": 120}
+        parsed = urlparse(url)
+        if parsed.netloc == urlparse(self.base_url).netloc or (
+                parsed.scheme == "https" and parsed.hostname in AUTHENTICATED_ARTIFACT_HOSTS):
+            response = self._request("GET", url, **kwargs)
+        else:
+            response = self.session.get(url, **kwargs)
+        
+        with response:
+            if response.status_code == 416:
+                # Nothing left to fetch: the partial file is complete
+                pass
+            else:
+                response.raise_for_status()
+                mode = "ab" if response.status_code == 206 else "wb"
+                with open(partial, mode) as handle:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        handle.write(chunk)
+        
+        os.replace(partial, path)
+        self.logger.info(f"Downloaded artifact {path}")
+        return path
+
+
+class _BuildSessionCache:
+    """On-disk ETag cache of build session pages, one file per build."""
+    
+    def __init__(self, build_id: str):
+        self.path = Path(Config.BUILD_CACHE_DIR) / f"{build_id}.json"
+        self._dirty = False
+        try:
+            self._pages = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self._pages = {}
+    
+    def get(self, key: str) -> Optional[dict]:
+        """Get the cached ETag and sessions for a page query."""
+        return self._pages.get(key)
+    
+    def put(self, key: str, etag: str, sessions: list):
+        """Store a page fetched with the given ETag."""
+        self._pages[key] = {"etag": etag, "sessions": sessions}
+        self._dirty = True
+    
+    def save(self):
+        """Write the cache back to disk if any page changed."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(self._pages))
+        os.replace(tmp_file, self.path)
 
 # Convenience function for backward compatibility
 def update_session_status(session_id: str, status: str, reason: str = "") -> bool:
     """Convenience function to update session status."""
     api = BrowserStackAPI()
-    return api.update_session_status(session_id, status, reason)
\ No newline at end of file
+    return api.update_session_status(session_id, status, reason)
@@ -0,0 +1,194 @@
+"""Cross-process circuit breaker for WebDriver session creation."""
+
+import logging
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from ..config.config import Config
+from .rate_limiter import locked_json_state
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Statuses of a hub that is unreachable behind its gateway, or rejects the credentials. A plain
+# 500 is left out: it is how a W3C hub reports errors specific to one request
+OUTAGE_STATUSES = frozenset({401, 403, 502, 503, 504})
+
+# Messages of session requests the hub rejected for bad credentials, when no HTTP status is known
+AUTH_FAILURE_PATTERN = re.compile(r"\b(unauthori[sz]ed|forbidden|authori[sz]ation required|invalid .*access key)\b", re.I)
+
+
+class SessionCircuitOpen(RuntimeError):
+    """Raised instead of creating a session while the circuit is open."""
+
+
+def is_session_outage(error: BaseException, status: int = None) -> bool:
+    """
+    Check whether a session creation error means no session can be created.
+    
+    Only an unreachable hub (connection errors and timeouts, or a gateway
+    error) and rejected credentials count; see OUTAGE_STATUSES.
+    Errors specific to one session request, such as unsupported
+    capabilities or a full parallel quota, do not.
+    
+    Args:
+        error: Why the session could not be created
+        status: HTTP status of the hub's response, if the connection exposes it
+    """
+    from urllib3.exceptions import HTTPError as TransportError
+    
+    if isinstance(error, (OSError, TransportError)):
+        return True
+    if status is not None:
+        return status in OUTAGE_STATUSES
+    if isinstance(error, WebDriverException):
+        return bool(AUTH_FAILURE_PATTERN.search(error.msg or str(error)))
+    return False
+
+
+class SessionCircuitBreaker:
+    """
+    Stop every worker creating sessions once session creation keeps failing.
+    
+    State lives in a JSON file shared by all xdist workers. After
+    ``threshold`` consecutive failures, each within ``window`` seconds of the
+    previous one, the circuit opens and ``before_attempt()`` raises
+    SessionCircuitOpen at once instead of letting each test wait out its own
+    hub timeouts. After ``cooldown`` seconds one caller is let through as a
+    half-open probe. Only the probe's own outcome decides: its success
+    closes the circuit and its failure reopens it, whatever attempts that
+    were already under way report. A probe that fails for another reason
+    proves nothing either way and lets the next caller probe. Other callers
+    are rejected while the probe runs, for at most ``probe_timeout`` seconds
+    in case the probing worker dies.
+    """
+    
+    def __init__(self, path: Path, threshold: int, window: float, cooldown: float, probe_timeout: float):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+    
+    def before_attempt(self) -> Optional[str]:
+        """
+        Check that a session may be created now.
+        
+        Returns:
+            The probe ID to pass on with this attempt's outcome if it is the half-open probe, else None
+        
+        Raises:
+            SessionCircuitOpen: If the circuit is open, or half-open with a probe in flight
+        """
+        with locked_json_state(self.path) as state:
+            now = time.time()
+            if state.get("state", CLOSED) == CLOSED:
+                return None
+            if state.get("probe_until", 0) > now:
+                raise SessionCircuitOpen(self._reason(state, "a recovery probe is in progress"))
+            retry_at = state.get("opened_at", 0) + self.cooldown
+            if retry_at > now:
+                raise SessionCircuitOpen(self._reason(state, f"next probe in {retry_at - now:.0f}s"))
+            
+            probe = uuid.uuid4().hex
+            state.update({"state": HALF_OPEN, "probe_until": now + self.probe_timeout, "probe": probe})
+        logger.warning("Session circuit half-open; probing with one session")
+        return probe
+    
+    def record_success(self, probe: str = None):
+        """
+        Record a created session.
+        
+        Resets the consecutive failures of a closed circuit; an open or
+        half-open circuit is only closed by its probe.
+        
+        Args:
+            probe: The probe ID before_attempt returned for this attempt, if any
+        """
+        with locked_json_state(self.path) as state:
+            was = state.get("state", CLOSED)
+            if was != CLOSED and (probe is None or probe != state.get("probe")):
+                return
+            state.update({"state": CLOSED, "failures": 0, "probe_until": 0, "probe": None})
+        if was != CLOSED:
+            logger.info("Session circuit closed; session creation recovered")
+    
+    def release_probe(self, probe: str = None):
+        """Let the next caller probe after a probe failed for a reason other than an outage."""
+        if probe is None:
+            return
+        with locked_json_state(self.path) as state:
+            if state.get("state") == HALF_OPEN and state.get("probe") == probe:
+                state.update({"probe_until": 0, "probe": None})
+    
+    def record_failure(self, error: BaseException, probe: str = None):
+        """
+        Count a failed session creation, opening the circuit at the threshold.
+        
+        Args:
+            error: Why the session could not be created
+            probe: The probe ID before_attempt returned for this attempt, if any
+        """
+        with locked_json_state(self.path) as state:
+            now = time.time()
+            failures = state.get("failures", 0)
+            if now - state.get("last_failure", now) > self.window:
+                failures = 0
+            failures += 1
+            state.update({"failures": failures, "last_failure": now, "last_error": f"{type(error).__name__}: {error}"})
+            
+            # Only the current probe reopens the circuit, not attempts that were already under way
+            current = state.get("state", CLOSED)
+            reopen = current == HALF_OPEN and probe is not None and probe == state.get("probe")
+            if reopen or (current == CLOSED and failures >= self.threshold):
+                state.update({"state": OPEN, "opened_at": now, "probe_until": 0, "probe": None})
+                state["opened"] = state.get("opened", 0) + 1
+                opened = True
+            else:
+                opened = False
+        if opened:
+            logger.error(
+                f"Session circuit {'reopened' if reopen else 'opened'} after {failures} "
+                f"consecutive session failures; last: {state['last_error']}"
+            )
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the shared circuit state."""
+        with locked_json_state(self.path) as state:
+            return dict(state)
+    
+    def _reason(self, state: Dict[str, Any], detail: str) -> str:
+        return (
+            f"BrowserStack session creation circuit is open after {state.get('failures', 0)} consecutive "
+            f"failures ({detail}); last error: {state.get('last_error')}"
+        )
+
+
+_breaker: Optional[SessionCircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+
+def get_session_breaker() -> Optional[SessionCircuitBreaker]:
+    """Get the process-wide session circuit breaker, or None when disabled."""
+    global _breaker
+    if Config.SESSION_BREAKER_THRESHOLD <= 0:
+        return None
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = SessionCircuitBreaker(
+                Config.SESSION_BREAKER_FILE,
+                Config.SESSION_BREAKER_THRESHOLD,
+                Config.SESSION_BREAKER_WINDOW,
+                Config.SESSION_BREAKER_COOLDOWN,
+                Config.SESSION_BREAKER_PROBE_TIMEOUT,
+            )
+        return _breaker
@@ -0,0 +1,135 @@
+"""WebDriver command-level latency instrumentation."""
+
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Module prefix used to attribute commands to page-object methods
+PAGES_PACKAGE = __name__.rsplit(".utils.", 1)[0] + ".pages"
+
+# Longest parameter value kept in a command's parameter summary
+MAX_PARAM_LENGTH = 80
+
+
+def summarize_params(params: Any) -> Dict[str, Any]:
+    """Reduce command parameters to a short, JSON-safe summary."""
+    if not isinstance(params, dict):
+        return {}
+    summary = {}
+    for key, value in params.items():
+        if isinstance(value, (int, float, bool)) or value is None:
+            summary[key] = value
+        elif isinstance(value, str):
+            summary[key] = value if len(value) <= MAX_PARAM_LENGTH else f"{value[:MAX_PARAM_LENGTH]}..."
+        elif isinstance(value, (list, tuple)):
+            summary[key] = f"<{len(value)} items>"
+        else:
+            summary[key] = f"<{type(value).__name__}>"
+    return summary
+
+
+def find_page_method() -> Optional[str]:
+    """Get the outermost page-object method on the current call stack."""
+    caller = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_globals.get("__name__", "").startswith(PAGES_PACKAGE):
+            owner = frame.f_locals.get("self")
+            name = type(owner).__name__ if owner is not None else frame.f_globals["__name__"]
+            caller = f"{name}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return caller
+
+
+class CommandRecorder:
+    """
+    Record every WebDriver command sent through a driver's command executor.
+    
+    Each record holds the command name, a parameter summary, the wall-clock
+    start time, duration, HTTP status (``None`` when the request raised) and
+    the page-object method that issued it.
+    """
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.records: List[Dict[str, Any]] = []
+        self._executor = driver.command_executor
+        self._original_execute = self._executor.execute
+    
+    def install(self) -> "CommandRecorder":
+        """Start recording commands issued by the driver."""
+        original_execute = self._original_execute
+        
+        def execute(command, params):
+            started = time.time()
+            start = time.perf_counter()
+            status = None
+            try:
+                response = original_execute(command, params)
+                status = response.get("status") if isinstance(response, dict) else None
+                # W3C success responses carry no status; errors carry the HTTP code
+                status = status if isinstance(status, int) and status >= 100 else 200
+                return response
+            finally:
+                self.records.append({
+                    "command": command,
+                    "params": summarize_params(params),
+                    "start": round(started, 4),
+                    "duration": round(time.perf_counter() - start, 4),
+                    "status": status,
+                    "caller": find_page_method(),
+                })
+        
+        self._executor.execute = execute
+        return self
+    
+    def uninstall(self):
+        """Stop recording and restore the original executor."""
+        self._executor.execute = self._original_execute
+    
+    def drain(self) -> List[Dict[str, Any]]:
+        """Return the commands recorded so far and start a new timeline."""
+        records, self.records = self.records, []
+        return records
+    
+    @staticmethod
+    def summarize(records: List[Dict[str, Any]], slowest: int = 3) -> Dict[str, Any]:
+        """Summarize a command timeline."""
+        ranked = sorted(records, key=lambda r: r["duration"], reverse=True)[:slowest]
+        return {
+            "commands": len(records),
+            "remote_seconds": round(sum(r["duration"] for r in records), 3),
+            "slowest": [
+                {"command": r["command"], "duration": r["duration"], "caller": r["caller"]}
+                for r in ranked
+            ],
+        }
+    
+    @staticmethod
+    def write_timeline(test_id: str, records: List[Dict[str, Any]], directory: Path = None) -> Path:
+        """Write a test's command timeline to the command log directory."""
+        directory = Path(directory or Config.COMMAND_LOG_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        file_name = test_id.replace("::", "_").replace("/", "_").replace("[", "_").replace("]", "")
+        path = directory / f"{file_name}.json"
+        path.write_text(json.dumps({
+            "test": test_id,
+            "summary": CommandRecorder.summarize(records),
+            "commands": records,
+        }, indent=2))
+        logger.debug(f"Command timeline saved: {path}")
+        return path
+
+
+def install_command_recorder(driver) -> CommandRecorder:
+    """Attach a CommandRecorder to a driver as ``driver.command_recorder``."""
+    recorder = CommandRecorder(driver).install()
+    driver.command_recorder = recorder
+    return recorder
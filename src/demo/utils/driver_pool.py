@@ -0,0 +1,157 @@
+"""Pool of reusable WebDriver sessions keyed by platform."""
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, List
+
+from selenium.common.exceptions import WebDriverException
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+from ..config.config import Config
+from .driver_factory import DriverFactory
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPool:
+    """
+    Hand out warm WebDriver sessions instead of creating one per test.
+    
+    Pools are per process, so every xdist worker keeps its own sessions.
+    Between tests a session is reset (extra windows closed, cookies and web
+    storage cleared, ``about:blank`` loaded). Sessions are retired after
+    ``max_uses`` tests or when a test using them fails, which also keeps a
+    failed BrowserStack session's status from being overwritten by a later
+    passing test. A keepalive thread touches idle sessions so they do not
+    hit the hub's ``idleTimeout``.
+    """
+    
+    def __init__(self, max_uses: int = None, keepalive_interval: int = None):
+        self.max_uses = max_uses or Config.DRIVER_POOL_MAX_USES
+        self.keepalive_interval = keepalive_interval or Config.DRIVER_KEEPALIVE_INTERVAL
+        self._idle: Dict[str, List["WebDriver"]] = {}
+        self._uses: Dict[str, int] = {}
+        self._platforms: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._keepalive = threading.Thread(target=self._keepalive_loop, name="driver-keepalive", daemon=True)
+        self._keepalive.start()
+    
+    def acquire(self, browser_type: str = None, **driver_kwargs) -> "WebDriver":
+        """Get a healthy session for a platform, creating one if none is idle."""
+        browser_type = browser_type or Config.BROWSER_TYPE
+        while True:
+            with self._lock:
+                idle = self._idle.get(browser_type)
+                driver = idle.pop() if idle else None
+            if driver is None:
+                break
+            if self._is_alive(driver):
+                logger.info(f"Reusing pooled {browser_type} session {driver.session_id}")
+                return driver
+            self._retire(driver)
+        
+        driver = DriverFactory.create_driver(browser_type=browser_type, **driver_kwargs)
+        with self._lock:
+            self._uses[driver.session_id] = 0
+            self._platforms[driver.session_id] = browser_type
+        logger.info(f"Created pooled {browser_type} session {driver.session_id}")
+        return driver
+    
+    def release(self, driver: "WebDriver", failed: bool = False):
+        """
+        Return a session to the pool after a test.
+        
+        Args:
+            driver: Session previously returned by acquire
+            failed: Whether the test using it failed; failed sessions are retired
+        """
+        session_id = driver.session_id
+        with self._lock:
+            self._uses[session_id] = self._uses.get(session_id, 0) + 1
+            uses = self._uses[session_id]
+            browser_type = self._platforms.get(session_id)
+        
+        # A session the pool did not create has no platform to be reused for
+        if failed or uses >= self.max_uses or browser_type is None:
+            logger.info(f"Retiring session {session_id} after {uses} uses (failed={failed})")
+            self._retire(driver)
+            return
+        
+        try:
+            self.reset(driver)
+        except WebDriverException as e:
+            logger.warning(f"Failed to reset session {session_id}, retiring it: {e}")
+            self._retire(driver)
+            return
+        
+        with self._lock:
+            self._idle.setdefault(browser_type, []).append(driver)
+    
+    @staticmethod
+    def reset(driver: "WebDriver"):
+        """Clear per-test browser state so the session can be reused."""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except WebDriverException:
+            # Storage is not accessible on some pages (e.g. about:blank)
+            pass
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+    
+    def close_all(self):
+        """Stop the keepalive thread and quit every idle session."""
+        self._stopped.set()
+        with self._lock:
+            drivers = [driver for idle in self._idle.values() for driver in idle]
+            self._idle.clear()
+        for driver in drivers:
+            self._retire(driver)
+    
+    def _retire(self, driver: "WebDriver"):
+        """Quit a session and forget it."""
+        with self._lock:
+            self._uses.pop(driver.session_id, None)
+            self._platforms.pop(driver.session_id, None)
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            logger.debug(f"Error quitting retired session: {e}")
+    
+    @staticmethod
+    def _is_alive(driver: "WebDriver") -> bool:
+        """Check that a session still responds."""
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+    
+    def _keepalive_loop(self):
+        """Periodically touch idle sessions so the hub keeps them open, retiring dead ones."""
+        while not self._stopped.wait(self.keepalive_interval):
+            with self._lock:
+                idle = [(browser_type, driver) for browser_type, drivers in self._idle.items() for driver in drivers]
+            # Ping outside the lock so acquire/release are not blocked on the hub
+            for browser_type, driver in idle:
+                if self._stopped.is_set():
+                    return
+                if self._is_alive(driver):
+                    continue
+                with self._lock:
+                    drivers = self._idle.get(browser_type, [])
+                    # An acquire may have taken the session meanwhile; acquire checks it itself
+                    still_idle = driver in drivers
+                    if still_idle:
+                        drivers.remove(driver)
+                if still_idle:
+                    logger.warning(f"Idle session {driver.session_id} is no longer alive, retiring it")
+                    self._retire(driver)
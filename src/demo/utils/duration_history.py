@@ -0,0 +1,157 @@
+"""Per-platform test duration history and longest-first work planning."""
+
+import heapq
+import json
+import logging
+import math
+import os
+import statistics
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..config.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class DurationHistory:
+    """
+    Record how long each test takes per platform and predict the next run.
+    
+    Durations are keyed by platform (a browserstack.yml platform key, or
+    ``local``) and test nodeid. A test's prediction is the median of its last
+    ``Config.DURATION_HISTORY_SIZE`` runs; a test without history is assumed
+    to take as long as the platform's median test, or
+    ``Config.DURATION_DEFAULT`` on a platform without any history.
+    """
+    
+    def __init__(self, history_file: Path = None):
+        self.history_file = Path(history_file or Config.DURATION_HISTORY_FILE)
+        self._history: Dict[str, Dict[str, List[float]]] = self._load()
+        self._new_samples: Dict[str, Dict[str, List[float]]] = {}
+        self._platform_defaults: Dict[str, float] = {}
+    
+    def _load(self) -> Dict[str, Dict[str, List[float]]]:
+        """Load the duration history file, tolerating a missing or corrupt file."""
+        try:
+            return json.loads(self.history_file.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable duration history {self.history_file}: {e}")
+            return {}
+    
+    def record(self, platform: str, nodeid: str, seconds: float):
+        """Record how long a test took, setup and teardown included."""
+        self._new_samples.setdefault(platform, {}).setdefault(nodeid, []).append(round(seconds, 3))
+    
+    def predict(self, platform: str, nodeid: str) -> float:
+        """Predict how long a test will take on a platform."""
+        samples = self._history.get(platform, {}).get(nodeid)
+        if samples:
+            return statistics.median(samples)
+        if platform not in self._platform_defaults:
+            medians = [statistics.median(s) for s in self._history.get(platform, {}).values() if s]
+            self._platform_defaults[platform] = statistics.median(medians) if medians else Config.DURATION_DEFAULT
+        return self._platform_defaults[platform]
+    
+    def save(self):
+        """Merge the recorded durations into the history file, replacing it atomically."""
+        if not self._new_samples:
+            return
+        history = self._load()
+        for platform, new_samples in self._new_samples.items():
+            platform_history = history.setdefault(platform, {})
+            for nodeid, samples in new_samples.items():
+                merged = platform_history.get(nodeid, []) + samples
+                platform_history[nodeid] = merged[-Config.DURATION_HISTORY_SIZE:]
+        
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.history_file.with_name(f"{self.history_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(history, indent=2, sort_keys=True))
+        os.replace(tmp_file, self.history_file)
+        
+        self._history = history
+        self._new_samples = {}
+        self._platform_defaults = {}
+        logger.debug(f"Duration history saved: {self.history_file}")
+
+
+def plan_work_units(
+    durations: Dict[str, float],
+    groups: Dict[str, Optional[str]],
+    workers: int,
+) -> List[Tuple[str, List[str], float]]:
+    """
+    Split tests into work units, longest first.
+    
+    Tests sharing a group (a pooled session or login snapshot) are kept
+    together so one worker reuses the shared state. A group predicted to take
+    longer than an even share of the run is split longest-first into enough
+    units to stay under that share, so affinity never serializes the build.
+    Ungrouped tests are units of their own.
+    
+    Args:
+        durations: Predicted seconds per test nodeid, in collection order
+        groups: Group per nodeid; missing or None means ungrouped
+        workers: Number of workers the units will be spread over
+    
+    Returns:
+        List of (unit name, nodeids, predicted seconds), longest first
+    """
+    share = max(sum(durations.values()) / max(workers, 1), max(durations.values(), default=0))
+    members: Dict[str, List[str]] = {}
+    units: List[Tuple[str, List[str], float]] = []
+    for nodeid, seconds in durations.items():
+        group = groups.get(nodeid)
+        if group is None:
+            units.append((nodeid, [nodeid], seconds))
+        else:
+            members.setdefault(group, []).append(nodeid)
+    
+    for group, nodeids in members.items():
+        total = sum(durations[nodeid] for nodeid in nodeids)
+        count = max(1, math.ceil(total / share - 1e-9)) if share else 1
+        chunks = [(0.0, index, []) for index in range(count)]
+        for nodeid in sorted(nodeids, key=lambda n: -durations[n]):
+            load, index, chunk = heapq.heappop(chunks)
+            chunk.append(nodeid)
+            heapq.heappush(chunks, (load + durations[nodeid], index, chunk))
+        for load, index, chunk in sorted(chunks, key=lambda c: c[1]):
+            if chunk:
+                units.append((f"{group}#{index}", chunk, load))
+    
+    return sorted(units, key=lambda unit: -unit[2])
+
+
+def assign_longest_first(unit_seconds: List[float], workers: int) -> List[List[int]]:
+    """
+    Plan which worker runs which units: longest first, each to the worker predicted to be free first.
+    
+    Args:
+        unit_seconds: Predicted seconds per unit, longest first
+        workers: Number of workers
+    
+    Returns:
+        Indices into ``unit_seconds`` per worker, in run order
+    """
+    loads = [(0.0, worker) for worker in range(max(workers, 1))]
+    plans: List[List[int]] = [[] for _ in loads]
+    for index, seconds in enumerate(unit_seconds):
+        load, worker = heapq.heappop(loads)
+        plans[worker].append(index)
+        heapq.heappush(loads, (load + seconds, worker))
+    return plans
+
+
+def predict_makespan(unit_seconds: List[float], workers: int) -> Tuple[float, List[float]]:
+    """
+    Simulate handing units, longest first, to whichever worker frees up first.
+    
+    Returns:
+        Tuple of the predicted makespan and each worker's predicted load
+    """
+    loads = [0.0] * max(workers, 1)
+    for seconds in sorted(unit_seconds, reverse=True):
+        heapq.heapreplace(loads, loads[0] + seconds)
+    return max(loads), sorted(loads, reverse=True)
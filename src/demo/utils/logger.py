@@ -1,18 +1,143 @@
 """Logging configuration for Demo test suite."""
 
+import atexit
+import gzip
+import heapq
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import shutil
 import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
 from pathlib import Path
-from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from ..config.config import Config
 
+# Test and session the current worker is running, stamped onto every record. New threads
+# start with an empty context, so background threads log without a nodeid or session_id.
+_log_context: ContextVar[Dict[str, Optional[str]]] = ContextVar(
+    "demo_log_context", default={"nodeid": None, "session_id": None}
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def worker_id() -> str:
+    """Get the xdist worker ID, or "main" outside xdist."""
+    return os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+
+def set_log_context(**values: Optional[str]):
+    """Set the nodeid and/or session_id attached to this thread's subsequent log records."""
+    _log_context.set({**_log_context.get(), **values})
+
+
+class _ContextFilter(logging.Filter):
+    """Stamp records with the worker, test nodeid and driver session ID."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        record.worker = worker_id()
+        record.nodeid = context["nodeid"]
+        record.session_id = context["session_id"]
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "worker": getattr(record, "worker", None),
+            "nodeid": getattr(record, "nodeid", None),
+            "session_id": getattr(record, "session_id", None),
+            "func": record.funcName,
+            "line": record.lineno,
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback separate from the message."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The default prepare() folds the traceback into the message text
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _gzip_rotator(source: str, dest: str):
+    """Compress a rotated log segment."""
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def worker_log_file(worker: str = None) -> Path:
+    """Path of a worker's JSON-lines log file."""
+    return Config.LOG_DIR / f"demo_{worker or worker_id()}.jsonl"
+
 
 def setup_logger():
-    """Setup logging configuration for the test suite."""
+    """
+    Setup logging configuration for the test suite.
+    
+    The root logger gets a single QueueHandler; a QueueListener thread does
+    the formatting and I/O for the console and, if enabled, this worker's
+    JSON-lines file. The file rotates at Config.LOG_MAX_BYTES and rotated
+    segments are gzipped.
+    """
+    global _listener
+    stop_logger()
+    
     # Create logs directory if it doesn't exist
     Config.LOG_DIR.mkdir(exist_ok=True)
     
+    # Console handler
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(getattr(logging, Config.LOG_LEVEL))
+    console_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%H:%M:%S'
+    ))
+    handlers: List[logging.Handler] = [console_handler]
+    
+    # Per-worker structured file handler (if enabled)
+    if Config.LOG_TO_FILE:
+        file_handler = logging.handlers.RotatingFileHandler(
+            worker_log_file(),
+            maxBytes=Config.LOG_MAX_BYTES,
+            backupCount=Config.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+        file_handler.namer = lambda name: f"{name}.gz"
+        file_handler.rotator = _gzip_rotator
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(file_handler)
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(_ContextFilter())
+    
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, Config.LOG_LEVEL))
@@ -20,31 +145,11 @@ def setup_logger():
     # Remove existing handlers
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
     
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, Config.LOG_LEVEL))
-    
-    # File handler (if enabled)
-    if Config.LOG_TO_FILE:
-        log_filename = f"demo_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        file_handler = logging.FileHandler(Config.LOG_DIR / log_filename)
-        file_handler.setLevel(logging.DEBUG)
-        
-        # Detailed format for file logs
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
-        )
-        file_handler.setFormatter(file_formatter)
-        root_logger.addHandler(file_handler)
-    
-    # Simple format for console logs
-    console_formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s',
-        datefmt='%H:%M:%S'
-    )
-    console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logger)
     
     # Set specific loggers to reduce noise
     logging.getLogger('selenium').setLevel(logging.WARNING)
@@ -52,6 +157,52 @@ def setup_logger():
     logging.getLogger('requests').setLevel(logging.WARNING)
 
 
+def stop_logger():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the specified name."""
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
+
+
+def _read_segment(path: Path) -> Iterator[dict]:
+    """Read JSON-lines records from a plain or gzipped log segment."""
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _worker_segments(current: Path) -> List[Path]:
+    """A worker's log segments, oldest first."""
+    rotated = sorted(
+        current.parent.glob(f"{current.name}.*.gz"),
+        key=lambda p: int(p.name[len(current.name) + 1:-len(".gz")]),
+        reverse=True,
+    )
+    return rotated + ([current] if current.exists() else [])
+
+
+def merge_worker_logs(log_dir: Path = None) -> Iterator[dict]:
+    """
+    Interleave every worker's JSON-lines log, including rotated segments, by timestamp.
+    
+    Each worker's log is already in time order, so the logs are merged
+    lazily without loading them into memory.
+    """
+    log_dir = Path(log_dir or Config.LOG_DIR)
+    
+    def worker_records(current: Path) -> Iterator[dict]:
+        for segment in _worker_segments(current):
+            yield from _read_segment(segment)
+    
+    streams: Iterable[Iterator[dict]] = [worker_records(path) for path in sorted(log_dir.glob("demo_*.jsonl"))]
+    return heapq.merge(*streams, key=lambda entry: entry["ts"])
@@ -0,0 +1,111 @@
+"""xdist scheduler that hands out the longest predicted work first."""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pytest
+from xdist.scheduler import LoadScopeScheduling
+
+from ..config.config import Config
+from .duration_history import DurationHistory, assign_longest_first, plan_work_units, predict_makespan
+
+logger = logging.getLogger(__name__)
+
+
+def nodeid_platform(nodeid: str, platforms: Iterable[str]) -> Optional[str]:
+    """Get the platform key a test was parametrized with, if any."""
+    if not nodeid.endswith("]") or "[" not in nodeid:
+        return None
+    params = nodeid[nodeid.index("[") + 1:-1].split("-")
+    return next((param for param in params if param in platforms), None)
+
+
+class LongestFirstScheduling(LoadScopeScheduling):
+    """
+    Longest-processing-time-first load scheduling.
+    
+    Tests are packed into work units by ``plan_work_units`` using predicted
+    durations from ``DurationHistory``. When driver pooling or auth
+    snapshots are enabled, tests on the same platform share a unit so the
+    worker running it reuses the session or login.
+    
+    An xdist worker only starts a test once it knows its next one, so it
+    must be sent a unit before it is idle, while its last test is still
+    queued. The units are therefore assigned up front by simulating
+    longest-first scheduling on the predicted durations, and each worker is
+    sent its next planned unit when one of its tests is left, holding at
+    most one unit beyond the one it runs. A worker that runs out of planned
+    units takes the longest unit still queued.
+    """
+    
+    def __init__(self, config: pytest.Config, log=None, history: DurationHistory = None):
+        super().__init__(config, log)
+        self.history = history or DurationHistory()
+        self.prediction: Optional[Tuple[float, List[float]]] = None
+        self._unit_of: Dict[str, str] = {}
+        self._unit_seconds: Dict[str, float] = {}
+        # Planned unit names per worker, handed to nodes as they first ask for work
+        self._plans: List[List[str]] = []
+        self._node_plans: Dict[Any, List[str]] = {}
+    
+    def schedule(self):
+        """Plan work units from the collection, then distribute them."""
+        if self.collection is None and self.registered_collections:
+            self._plan(next(iter(self.registered_collections.values())))
+        super().schedule()
+    
+    def _plan(self, collection: List[str]):
+        """Predict each test's duration and group tests into work units."""
+        platforms = set(Config.get_platforms())
+        share_state = Config.DRIVER_POOL or Config.AUTH_SNAPSHOTS
+        durations: Dict[str, float] = {}
+        groups: Dict[str, Optional[str]] = {}
+        for nodeid in collection:
+            platform = nodeid_platform(nodeid, platforms) or Config.BROWSER_TYPE
+            durations[nodeid] = self.history.predict(Config.get_platform_name(platform), nodeid)
+            groups[nodeid] = platform if share_state else None
+        
+        units = plan_work_units(durations, groups, len(self.nodes))
+        for name, nodeids, seconds in units:
+            self._unit_seconds[name] = seconds
+            for nodeid in nodeids:
+                self._unit_of[nodeid] = name
+        
+        unit_seconds = [seconds for _, _, seconds in units]
+        self._plans = [
+            [units[index][0] for index in plan] for plan in assign_longest_first(unit_seconds, len(self.nodes))
+        ]
+        self.prediction = predict_makespan(unit_seconds, len(self.nodes))
+        logger.info(
+            f"Planned {len(units)} work units for {len(self.nodes)} workers; "
+            f"predicted makespan {self.prediction[0]:.1f}s"
+        )
+    
+    def _split_scope(self, nodeid: str) -> str:
+        """Work unit of a test."""
+        return self._unit_of.get(nodeid, nodeid)
+    
+    def _reschedule(self, node):
+        """Send the node its next unit once only one of its tests is left."""
+        if node.shutting_down:
+            return
+        if not self.workqueue:
+            node.shutdown()
+            return
+        if self._pending_of(self.assigned_work[node]) > 1:
+            return
+        self._assign_work_unit(node)
+    
+    def _assign_work_unit(self, node):
+        """Give the node its next planned unit, or else the longest queued unit."""
+        if node not in self._node_plans:
+            self._node_plans[node] = self._plans.pop(0) if self._plans else []
+        plan = self._node_plans[node]
+        while plan and plan[0] not in self.workqueue:
+            plan.pop(0)
+        if plan:
+            unit = plan.pop(0)
+        else:
+            unit = max(self.workqueue, key=lambda name: self._unit_seconds.get(name, 0.0))
+        self.workqueue.move_to_end(unit, last=False)
+        super()._assign_work_unit(node)
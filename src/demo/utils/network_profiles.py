@@ -0,0 +1,90 @@
+"""Chrome DevTools Protocol network profiles for local Chrome runs."""
+
+import logging
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+# Throughput values are bytes per second; -1 disables throttling
+NETWORK_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "blocked_urls": [],
+        "cache": "warm",
+        "conditions": None,
+    },
+    "fast": {
+        # Nothing we assert on needs images, fonts or third-party scripts
+        "blocked_urls": [
+            "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp",
+            "*.woff", "*.woff2", "*.ttf", "*.otf",
+            "*google-analytics.com*", "*googletagmanager.com*",
+            "*doubleclick.net*", "*facebook.net*", "*hotjar.com*",
+        ],
+        "cache": "warm",
+        "conditions": None,
+    },
+    "realistic_4g": {
+        "blocked_urls": [],
+        "cache": "disabled",
+        "conditions": {"latency": 70, "download": 4 * 1024 * 1024 // 8, "upload": 3 * 1024 * 1024 // 8},
+    },
+    "slow_3g": {
+        "blocked_urls": [],
+        "cache": "disabled",
+        "conditions": {"latency": 400, "download": 400 * 1024 // 8, "upload": 400 * 1024 // 8},
+    },
+}
+
+
+def supports_cdp(driver: "WebDriver") -> bool:
+    """Check whether a driver talks to a local Chromium-based chromedriver."""
+    from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+    
+    return isinstance(getattr(driver, "command_executor", None), ChromiumRemoteConnection)
+
+
+def execute_cdp(driver: "WebDriver", cmd: str, params: Dict[str, Any] = None) -> Any:
+    """Run a CDP command on webdriver.Chrome or a Remote session on chromedriver."""
+    params = params or {}
+    if hasattr(driver, "execute_cdp_cmd"):
+        return driver.execute_cdp_cmd(cmd, params)
+    return driver.execute("executeCdpCommand", {"cmd": cmd, "params": params})["value"]
+
+
+def apply_network_profile(driver: "WebDriver", name: str) -> bool:
+    """
+    Apply a named network profile to a session.
+    
+    Every setting is applied explicitly, so switching profiles on a reused
+    session fully replaces the previous one.
+    
+    Args:
+        driver: Local Chrome session
+        name: Key of NETWORK_PROFILES
+        
+    Returns:
+        bool: True if applied, False if the driver does not support CDP
+    """
+    if name not in NETWORK_PROFILES:
+        raise ValueError(f"Unknown network profile: {name}")
+    if not supports_cdp(driver):
+        logger.debug(f"Network profile '{name}' skipped: driver does not support CDP")
+        return False
+    
+    profile = NETWORK_PROFILES[name]
+    conditions = profile["conditions"] or {"latency": 0, "download": -1, "upload": -1}
+    
+    execute_cdp(driver, "Network.enable")
+    execute_cdp(driver, "Network.setBlockedURLs", {"urls": profile["blocked_urls"]})
+    execute_cdp(driver, "Network.setCacheDisabled", {"cacheDisabled": profile["cache"] == "disabled"})
+    execute_cdp(driver, "Network.emulateNetworkConditions", {
+        "offline": False,
+        "latency": conditions["latency"],
+        "downloadThroughput": conditions["download"],
+        "uploadThroughput": conditions["upload"],
+    })
+    logger.info(f"Applied network profile: {name}")
+    return True
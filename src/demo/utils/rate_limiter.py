@@ -0,0 +1,158 @@
+"""Cross-process token bucket for BrowserStack REST API calls."""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from ..config.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def locked_json_state(path: Path) -> Iterator[Dict]:
+    """
+    Yield a JSON state file's contents under an exclusive lock, then write them back.
+    
+    Every process on the machine that uses the same path is serialised on
+    the lock; a missing or unreadable file yields an empty dict.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+") as handle:
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            handle.seek(0)
+            try:
+                state = json.loads(handle.read() or "{}")
+            except ValueError:
+                state = {}
+            yield state
+            handle.seek(0)
+            handle.truncate()
+            handle.write(json.dumps(state))
+            handle.flush()
+        finally:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FileTokenBucket:
+    """
+    Token bucket whose state lives in a file shared by every process.
+    
+    All xdist workers and parallel Jenkins stages on a machine take tokens
+    from the same bucket, serialised by an exclusive lock on the state file.
+    A 429 from the API blocks the whole bucket until its Retry-After has
+    passed, so one worker's rate limit pauses everyone instead of each
+    worker discovering it separately.
+    """
+    
+    def __init__(self, path: Path, rate: float, capacity: int):
+        self.path = Path(path)
+        self.rate = rate
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.blocks = 0
+    
+    def _try_take(self) -> float:
+        """Take a token if one is available; otherwise return how long to wait."""
+        with locked_json_state(self.path) as state:
+            now = time.time()
+            blocked_until = state.get("blocked_until", 0)
+            if blocked_until > now:
+                return blocked_until - now
+            
+            tokens = state.get("tokens", self.capacity)
+            elapsed = max(0.0, now - state.get("updated", now))
+            tokens = min(self.capacity, tokens + elapsed * self.rate)
+            state["updated"] = now
+            if tokens >= 1:
+                state["tokens"] = tokens - 1
+                return 0.0
+            state["tokens"] = tokens
+            return (1 - tokens) / self.rate
+    
+    def acquire(self) -> float:
+        """
+        Block until a token is available.
+        
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait = self._try_take()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+        
+        with self._lock:
+            self.acquired += 1
+            if waited:
+                self.waits += 1
+                self.wait_seconds += waited
+        if waited:
+            logger.debug(f"Waited {waited:.2f}s for a BrowserStack API token")
+        return waited
+    
+    def block(self, seconds: float):
+        """Stop every process from taking tokens for the given time."""
+        with locked_json_state(self.path) as state:
+            state["blocked_until"] = max(state.get("blocked_until", 0), time.time() + seconds)
+            state["tokens"] = 0
+            state["updated"] = time.time()
+        with self._lock:
+            self.blocks += 1
+        logger.warning(f"BrowserStack API rate limited; pausing all workers for {seconds:.1f}s")
+    
+    def metrics(self) -> Dict[str, float]:
+        """Get this process's token, wait-time and block counters."""
+        with self._lock:
+            return {
+                "rate_limit_acquired": self.acquired,
+                "rate_limit_waits": self.waits,
+                "rate_limit_wait_seconds": round(self.wait_seconds, 3),
+                "rate_limit_blocks": self.blocks,
+            }
+
+
+_limiter: Optional[FileTokenBucket] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[FileTokenBucket]:
+    """Get the process-wide API rate limiter, or None when disabled."""
+    global _limiter
+    if Config.BROWSERSTACK_API_RATE <= 0:
+        return None
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = FileTokenBucket(
+                Config.BROWSERSTACK_RATE_LIMIT_FILE,
+                Config.BROWSERSTACK_API_RATE,
+                Config.BROWSERSTACK_API_BURST,
+            )
+        return _limiter
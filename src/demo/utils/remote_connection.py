@@ -0,0 +1,146 @@
+"""Pooled keep-alive HTTP transport for the Remote WebDriver command channel."""
+
+import logging
+import socket
+import threading
+from typing import Dict, Optional
+
+import urllib3
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from urllib3.util.timeout import Timeout
+from selenium.webdriver.remote.client_config import ClientConfig
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+from ..config.config import Config
+from .transport_stats import TransportStats, counting_pool_classes
+
+logger = logging.getLogger(__name__)
+
+# Read timeouts (seconds) for commands that legitimately take longer than
+# Config.REMOTE_COMMAND_TIMEOUT
+COMMAND_TIMEOUTS: Dict[str, float] = {
+    Command.NEW_SESSION: 300,
+    Command.QUIT: 60,
+    Command.GET: 120,
+    Command.W3C_EXECUTE_SCRIPT_ASYNC: 120,
+    Command.SCREENSHOT: 60,
+    Command.ELEMENT_SCREENSHOT: 60,
+}
+
+# POST commands that only read state and are safe to resend
+IDEMPOTENT_COMMANDS = frozenset({
+    Command.FIND_ELEMENT,
+    Command.FIND_ELEMENTS,
+    Command.FIND_CHILD_ELEMENT,
+    Command.FIND_CHILD_ELEMENTS,
+})
+
+# Methods whose commands are idempotent by definition
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "DELETE"})
+
+
+class _CommandPoolManager(urllib3.PoolManager):
+    """PoolManager that applies the current command's timeout and retry policy."""
+    
+    def __init__(self, connection: "PooledRemoteConnection", **kwargs):
+        super().__init__(**kwargs)
+        self._connection = connection
+        self.pool_classes_by_scheme = counting_pool_classes(connection.stats)
+    
+    def urlopen(self, method, url, redirect=True, **kw):
+        command = self._connection.current_command
+        kw["timeout"] = self._connection.timeout_for(command)
+        kw["retries"] = self._connection.retries_for(method, command)
+        self._connection.stats.add("requests")
+        response = super().urlopen(method, url, redirect=redirect, **kw)
+        self._connection._local.status = response.status
+        if response.retries is not None and response.retries.history:
+            self._connection.stats.add("retries", len(response.retries.history))
+        return response
+
+
+class PooledRemoteConnection(RemoteConnection):
+    """
+    Remote WebDriver connection over an explicitly sized keep-alive pool.
+    
+    Connections stay open (with TCP keepalive) and are reused across
+    commands, so TLS handshakes happen once per pooled connection rather
+    than per command. Each command gets its own read timeout. Connection
+    failures are retried for every command, since nothing was sent.
+    Failures after the request may have reached the hub are retried only
+    for idempotent commands.
+    """
+    
+    def __init__(self, remote_server_addr: str, username: str = None, password: str = None,
+                 pool_size: int = None, retries: int = None, ignore_proxy: bool = False):
+        self.stats = TransportStats()
+        self.pool_size = pool_size or Config.REMOTE_POOL_SIZE
+        self.max_retries = Config.REMOTE_RETRIES if retries is None else retries
+        self._local = threading.local()
+        client_config = ClientConfig(
+            remote_server_addr=remote_server_addr,
+            keep_alive=True,
+            timeout=Config.REMOTE_COMMAND_TIMEOUT,
+            username=username,
+            password=password,
+        )
+        super().__init__(client_config=client_config, ignore_proxy=ignore_proxy)
+    
+    @property
+    def current_command(self) -> Optional[str]:
+        """Name of the command being sent on this thread."""
+        return getattr(self._local, "command", None)
+    
+    @property
+    def last_status(self) -> Optional[int]:
+        """HTTP status of this thread's last command, or None if no response arrived."""
+        return getattr(self._local, "status", None)
+    
+    def timeout_for(self, command: Optional[str]) -> Timeout:
+        """Get the connect/read timeout for a command."""
+        read = COMMAND_TIMEOUTS.get(command, Config.REMOTE_COMMAND_TIMEOUT)
+        return Timeout(connect=Config.REMOTE_CONNECT_TIMEOUT, read=read)
+    
+    def retries_for(self, method: str, command: Optional[str]) -> Retry:
+        """Get the retry policy for a command."""
+        idempotent = method in IDEMPOTENT_METHODS or command in IDEMPOTENT_COMMANDS
+        return Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries if idempotent else 0,
+            other=0,
+            status=0,
+            redirect=False,
+            allowed_methods=None if idempotent else Retry.DEFAULT_ALLOWED_METHODS,
+            backoff_factor=0.2,
+            raise_on_status=False,
+        )
+    
+    def execute(self, command, params):
+        self._local.command = command
+        self._local.status = None
+        try:
+            return super().execute(command, params)
+        finally:
+            self._local.command = None
+    
+    def _get_connection_manager(self):
+        if self._proxy_url:
+            return super()._get_connection_manager()
+        
+        pool_args = {
+            "num_pools": 4,
+            "maxsize": self.pool_size,
+            "block": True,
+            "socket_options": HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ],
+        }
+        if self._client_config.ignore_certificates:
+            pool_args["cert_reqs"] = "CERT_NONE"
+        elif self._client_config.ca_certs:
+            pool_args["cert_reqs"] = "CERT_REQUIRED"
+            pool_args["ca_certs"] = self._client_config.ca_certs
+        return _CommandPoolManager(self, **pool_args)
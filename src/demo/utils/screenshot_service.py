@@ -0,0 +1,230 @@
+"""Background, deduplicated screenshot writing."""
+
+import base64
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Optional, Tuple
+
+from ..config.config import Config
+from .rate_limiter import locked_json_state
+
+logger = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_chunks(data: bytes):
+    """Yield (type, payload) for each chunk of a PNG."""
+    offset = len(PNG_SIGNATURE)
+    while offset < len(data):
+        length, = struct.unpack(">I", data[offset:offset + 4])
+        chunk_type = data[offset + 4:offset + 8]
+        yield chunk_type, data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+
+
+def _png_chunk(chunk_type: bytes, payload: bytes) -> bytes:
+    """Encode a PNG chunk."""
+    crc = zlib.crc32(chunk_type + payload) & 0xFFFFFFFF
+    return struct.pack(">I", len(payload)) + chunk_type + payload + struct.pack(">I", crc)
+
+
+def optimize_png(data: bytes) -> bytes:
+    """
+    Losslessly shrink a PNG by recompressing its image data at the highest zlib level.
+    
+    Browsers encode screenshots for speed, not size. Ancillary chunks are
+    kept; anything that isn't a well-formed PNG is returned unchanged, as is
+    a PNG that would not get smaller.
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return data
+    try:
+        chunks = list(_png_chunks(data))
+        image_data = zlib.decompress(b"".join(payload for kind, payload in chunks if kind == b"IDAT"))
+    except (struct.error, zlib.error) as e:
+        logger.debug(f"Not optimizing malformed PNG: {e}")
+        return data
+    
+    out = [PNG_SIGNATURE]
+    for kind, payload in chunks:
+        if kind == b"IDAT":
+            if image_data is not None:
+                out.append(_png_chunk(b"IDAT", zlib.compress(image_data, 9)))
+                image_data = None
+        else:
+            out.append(_png_chunk(kind, payload))
+    optimized = b"".join(out)
+    return optimized if len(optimized) < len(data) else data
+
+
+class ScreenshotService:
+    """
+    Capture screenshots on the test thread and write them from a background thread.
+    
+    The test thread only waits for the remote screenshot command. Decoding,
+    PNG optimization and disk I/O happen on the writer thread. Each distinct
+    image is stored once per build under ``<SCREENSHOTS_DIR>/.by-hash/<build>``,
+    keyed by content hash, and every requested path is a hard link to it, so
+    retries that capture the same page cost no extra space. New images are
+    dropped once the build's store reaches Config.SCREENSHOT_BUILD_MAX_MB;
+    the bytes used are tracked in a locked usage file in the store, so all
+    workers share one budget.
+    """
+    
+    def __init__(self, output_dir: Path = None, build: str = None, max_bytes: int = None):
+        self.output_dir = Path(output_dir or Config.SCREENSHOTS_DIR)
+        build = build or os.environ.get("BUILD_NUMBER", "local")
+        self.store_dir = self.output_dir / ".by-hash" / build
+        self.usage_file = self.store_dir / "usage.json"
+        self.max_bytes = int(Config.SCREENSHOT_BUILD_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.stats = {"captured": 0, "written": 0, "deduplicated": 0, "dropped": 0}
+        self._stats_lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple[str, Path]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+        self._thread.start()
+    
+    def capture(self, driver, name: str) -> Path:
+        """
+        Take a screenshot and queue it for writing.
+        
+        Args:
+            driver: WebDriver to capture
+            name: File name, without the .png extension
+        
+        Returns:
+            Path: Where the screenshot will be written. The file may not exist
+            yet when this returns, and is never written if the build's budget
+            is used up; ``flush()`` waits for pending writes.
+        """
+        payload = driver.get_screenshot_as_base64()
+        path = self.output_dir / f"{name}.png"
+        self._count("captured")
+        self._queue.put((payload, path))
+        return path
+    
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait for queued screenshots to be written, then stop the writer thread.
+        
+        Returns:
+            bool: True if everything was written before the deadline
+        """
+        timeout = Config.SCREENSHOT_FLUSH_TIMEOUT if timeout is None else timeout
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Screenshot writer still busy after {timeout}s; some screenshots may be missing")
+            return False
+        logger.debug(f"Screenshot stats: {self.stats}")
+        return True
+    
+    def _count(self, stat: str):
+        """Increment a stat; capture() and the writer thread both update them."""
+        with self._stats_lock:
+            self.stats[stat] += 1
+    
+    def _run(self):
+        """Write queued screenshots until flushed."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            payload, path = item
+            try:
+                self._write(base64.b64decode(payload), path)
+            except Exception as e:
+                logger.error(f"Failed to write screenshot {path}: {e}")
+    
+    def _write(self, data: bytes, path: Path):
+        """Store the image once per content hash and link the requested path to it."""
+        stored = self.store_dir / f"{hashlib.sha256(data).hexdigest()}.png"
+        if stored.exists():
+            self._count("deduplicated")
+        elif not self._store(optimize_png(data), stored):
+            self._count("dropped")
+            logger.warning(f"Screenshot budget of {self.max_bytes} bytes reached for {self.store_dir.name}; not saving {path}")
+            return
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_link = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_link.unlink(missing_ok=True)
+        try:
+            os.link(stored, tmp_link)
+        except OSError:
+            # Hard links need the same filesystem and support for them
+            shutil.copyfile(stored, tmp_link)
+        os.replace(tmp_link, path)
+        logger.info(f"Screenshot saved: {path}")
+    
+    def _store(self, data: bytes, stored: Path) -> bool:
+        """
+        Write a new image to the store if it fits the build's budget.
+        
+        Runs under the usage file's lock, so workers neither overshoot the
+        budget nor store the same image twice.
+        
+        Returns:
+            bool: False if the image did not fit and was not stored
+        """
+        with locked_json_state(self.usage_file) as usage:
+            if stored.exists():
+                self._count("deduplicated")
+                return True
+            used = usage.get("bytes", 0)
+            if used + len(data) > self.max_bytes:
+                return False
+            tmp_file = stored.with_name(f"{stored.name}.{os.getpid()}.tmp")
+            tmp_file.write_bytes(data)
+            os.replace(tmp_file, stored)
+            usage["bytes"] = used + len(data)
+        self._count("written")
+        return True
+
+
+def prune_screenshot_stores(output_dir: Path = None, keep: str = None):
+    """
+    Delete the image stores of other builds.
+    
+    Screenshots already linked from them stay on disk; only the stores and
+    their usage counters go. Call it once per run, before any worker writes.
+    
+    Args:
+        output_dir: Screenshot directory. Defaults to Config.SCREENSHOTS_DIR.
+        keep: Build whose store is kept, e.g. a Jenkins build being re-run; None deletes every store
+    """
+    stores = Path(output_dir or Config.SCREENSHOTS_DIR) / ".by-hash"
+    if not stores.is_dir():
+        return
+    for store in stores.iterdir():
+        if store.is_dir() and store.name != keep:
+            shutil.rmtree(store, ignore_errors=True)
+            logger.debug(f"Pruned screenshot store {store}")
+
+
+_service: Optional[ScreenshotService] = None
+_service_lock = threading.Lock()
+
+
+def get_screenshot_service() -> ScreenshotService:
+    """Get the process-wide screenshot service, starting it on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ScreenshotService()
+        return _service
+
+
+def flush_screenshot_service(timeout: float = None) -> bool:
+    """Flush and stop the screenshot service if it was started."""
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    return service.flush(timeout) if service else True
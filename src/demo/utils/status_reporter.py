@@ -0,0 +1,165 @@
+"""Background, durable reporting of BrowserStack session statuses."""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional
+
+from ..config.config import Config
+
+if TYPE_CHECKING:
+    from .browserstack_api import BrowserStackAPI
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStatusReporter:
+    """
+    Send session status updates from a background thread.
+    
+    Updates are keyed by session ID, so repeated updates for a session that
+    has not been sent yet collapse into one; a pending "failed" is never
+    replaced by a later "passed". The pending set, including the update
+    being sent until the API acknowledges it, is journaled to a per-worker
+    file on every change, and a journal left behind by a crashed run is
+    picked up and sent by the next run of the same worker.
+    """
+    
+    def __init__(self, api: "BrowserStackAPI" = None, journal: Path = None):
+        # Imported here so that tests importing the reporter don't pay for requests
+        from .browserstack_api import BrowserStackAPI
+        
+        worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        self.api = api or BrowserStackAPI()
+        self.journal = Path(journal or Config.STATUS_QUEUE_DIR / f"status_queue_{worker}.json")
+        self._pending: Dict[str, Dict] = self._load_journal()
+        self._in_flight: Optional[str] = None
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="status-reporter", daemon=True)
+        self._thread.start()
+        
+        if self._pending:
+            logger.info(f"Resuming {len(self._pending)} unsent session status updates from {self.journal}")
+    
+    def submit(self, session_id: str, status: str, reason: str):
+        """
+        Queue a status update without waiting for it to be sent.
+        
+        The update is also appended to Config.SESSION_RECORD_FILE, which
+        ``main.py harvest-artifacts`` reads to find the run's failed sessions.
+        """
+        with self._condition:
+            self._record(session_id, status, reason)
+            queued = self._pending.get(session_id)
+            if queued and queued["status"] == "failed" and status != "failed":
+                logger.debug(f"Keeping pending failed status for session {session_id}")
+                return
+            self._pending[session_id] = {"status": status, "reason": reason, "attempts": 0}
+            self._write_journal()
+            self._condition.notify()
+    
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait for queued updates to be sent, then stop the worker thread.
+        
+        Returns:
+            bool: True if everything was sent before the deadline
+        """
+        timeout = Config.STATUS_FLUSH_TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while (self._pending or self._in_flight) and time.monotonic() < deadline:
+                self._condition.wait(deadline - time.monotonic())
+            self._stopping = True
+            remaining = len(self._pending)
+            self._condition.notify_all()
+        
+        if remaining:
+            logger.warning(f"{remaining} session status updates not sent; kept in {self.journal}")
+        return remaining == 0
+    
+    def _run(self):
+        """Send pending updates until stopped."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                # The update stays pending, and journaled, until it is acknowledged
+                session_id = next(iter(self._pending))
+                update = self._pending[session_id]
+                self._in_flight = session_id
+            
+            sent = False
+            try:
+                sent = self.api.update_session_status(session_id, update["status"], update["reason"])
+            except Exception as e:
+                logger.error(f"Error sending status for session {session_id}: {e}")
+            
+            with self._condition:
+                self._in_flight = None
+                # A newer update submitted meanwhile replaced this one and is still to be sent
+                if self._pending.get(session_id) is update:
+                    update["attempts"] += 1
+                    del self._pending[session_id]
+                    if not sent and update["attempts"] < Config.STATUS_MAX_ATTEMPTS:
+                        self._pending[session_id] = update
+                    elif not sent:
+                        logger.error(f"Giving up on status update for session {session_id}")
+                self._write_journal()
+                self._condition.notify_all()
+    
+    def _record(self, session_id: str, status: str, reason: str):
+        """Append the update to the run's session record."""
+        try:
+            Config.SESSION_RECORD_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(Config.SESSION_RECORD_FILE, "a") as handle:
+                handle.write(json.dumps({"session_id": session_id, "status": status, "reason": reason}) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not record session {session_id}: {e}")
+    
+    def _load_journal(self) -> Dict[str, Dict]:
+        """Load unsent updates left by a previous run."""
+        try:
+            return json.loads(self.journal.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable status journal {self.journal}: {e}")
+            return {}
+    
+    def _write_journal(self):
+        """Persist pending updates, the in-flight one included; called with the lock held."""
+        self.journal.parent.mkdir(parents=True, exist_ok=True)
+        if not self._pending:
+            self.journal.unlink(missing_ok=True)
+            return
+        tmp_file = self.journal.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps(self._pending))
+        os.replace(tmp_file, self.journal)
+
+
+_reporter: Optional[SessionStatusReporter] = None
+_reporter_lock = threading.Lock()
+
+
+def get_status_reporter() -> SessionStatusReporter:
+    """Get the process-wide status reporter, starting it on first use."""
+    global _reporter
+    with _reporter_lock:
+        if _reporter is None:
+            _reporter = SessionStatusReporter()
+        return _reporter
+
+
+def flush_status_reporter(timeout: float = None) -> bool:
+    """Flush and stop the status reporter if it was started."""
+    global _reporter
+    with _reporter_lock:
+        reporter, _reporter = _reporter, None
+    return reporter.flush(timeout) if reporter else True
@@ -0,0 +1,115 @@
+"""Named test steps with checkpoints and in-place retries."""
+
+import functools
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from selenium.common.exceptions import ElementClickInterceptedException, StaleElementReferenceException
+
+from ..config.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Errors raised before an action takes effect, so the step can safely run again
+RETRYABLE_STEP_ERRORS = (StaleElementReferenceException, ElementClickInterceptedException)
+
+# Steps of the running test, oldest first; collected by tests/conftest.py
+_records: List[Dict[str, Any]] = []
+
+
+def take_step_records() -> List[Dict[str, Any]]:
+    """Return the current test's step records and start a new list."""
+    records = _records[:]
+    _records.clear()
+    return records
+
+
+def completed_steps() -> List[str]:
+    """Names of the current test's passed steps: its checkpoints."""
+    return [record["name"] for record in _records if record["status"] == "passed"]
+
+
+class _Step:
+    """See ``step()``."""
+    
+    def __init__(self, name: str, attempts: int = None):
+        self.name = name
+        self.attempts = attempts
+        self._started: Optional[float] = None
+    
+    def _record(self, status: str, attempts: int, started: float, error: BaseException = None):
+        record = {
+            "name": self.name,
+            "status": status,
+            "attempts": attempts,
+            "seconds": round(time.monotonic() - started, 3),
+        }
+        if error is not None:
+            record["error"] = type(error).__name__
+        _records.append(record)
+        if status == "failed":
+            logger.error(f"Step failed: {self.name}; checkpoints reached: {completed_steps() or 'none'}")
+    
+    def __enter__(self):
+        logger.info(f"Step: {self.name}")
+        self._started = time.monotonic()
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        self._record("failed" if exc else "passed", 1, self._started, exc)
+        return False
+    
+    def __call__(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            attempts = self.attempts or Config.STEP_MAX_ATTEMPTS
+            started = time.monotonic()
+            logger.info(f"Step: {self.name}")
+            for attempt in range(1, attempts + 1):
+                try:
+                    result = func(*args, **kwargs)
+                except RETRYABLE_STEP_ERRORS as e:
+                    if attempt == attempts:
+                        self._record("failed", attempt, started, e)
+                        raise
+                    logger.warning(f"Step {self.name} attempt {attempt}/{attempts} hit {type(e).__name__}; retrying")
+                    recover = getattr(args[0], "recover_step", None) if args else None
+                    if recover:
+                        try:
+                            recover()
+                        except Exception as recover_error:
+                            logger.warning(f"Recovery before retrying step {self.name} failed: {recover_error}")
+                except Exception as e:
+                    self._record("failed", attempt, started, e)
+                    raise
+                else:
+                    self._record("passed", attempt, started)
+                    return result
+        return run
+
+
+def step(name: str, attempts: int = None) -> _Step:
+    """
+    Mark a named step of a test flow.
+    
+    As a context manager the step is a checkpoint: its outcome and duration
+    are recorded, and a failure logs which earlier steps completed. As a
+    decorator on a page-object method, the method is also re-run in place,
+    up to ``attempts`` times (default Config.STEP_MAX_ATTEMPTS), when it
+    raises a stale-element or click-interception error, after calling the
+    page's ``recover_step()`` if it has one. Those errors are raised before
+    the click or keystroke takes effect, so a retry never repeats an action,
+    as long as the decorated method only locates and acts: waits after the
+    action belong to its caller. Any other error fails the step, and the
+    test, at once.
+    
+    Usage:
+        with step("Login"):
+            login_page.login()
+        
+        @step("Click Samsung filter")
+        def _click_samsung_filter(self):
+            self.click_element(*self.SAMSUNG_FILTER)
+    """
+    return _Step(name, attempts)
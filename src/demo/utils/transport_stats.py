@@ -0,0 +1,61 @@
+"""Request and connection-reuse counters for pooled urllib3 transports."""
+
+import threading
+from typing import Dict
+
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class TransportStats:
+    """Thread-safe counters for a pooled HTTP transport."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.retries = 0
+    
+    def add(self, name: str, amount: int = 1):
+        """Increment a counter."""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+    
+    def as_dict(self) -> Dict[str, int]:
+        """Get a snapshot of the counters."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.connections_reused,
+                "retries": self.retries,
+            }
+
+
+def counting_pool_classes(stats: TransportStats) -> Dict[str, type]:
+    """Get urllib3 pool classes, by scheme, that count new versus reused connections."""
+    return {
+        "http": _counting_pool(HTTPConnectionPool, stats),
+        "https": _counting_pool(HTTPSConnectionPool, stats),
+    }
+
+
+def _counting_pool(base, stats: TransportStats):
+    """Build a connection pool class that counts new versus reused connections."""
+    
+    class CountingConnection(base.ConnectionCls):
+        def connect(self):
+            stats.add("connections_opened")
+            return super().connect()
+    
+    class CountingPool(base):
+        ConnectionCls = CountingConnection
+        
+        def _get_conn(self, timeout=None):
+            conn = super()._get_conn(timeout)
+            # A connection with a live socket is reused; otherwise connect() runs
+            if getattr(conn, "sock", None) is not None:
+                stats.add("connections_reused")
+            return conn
+    
+    return CountingPool
@@ -0,0 +1,169 @@
+"""Adaptive wait engine that learns per-locator latency across runs."""
+
+import json
+import logging
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..config.config import Config
+
+logger = logging.getLogger(__name__)
+
+# WebDriverWait's default poll interval, used until a locator has history
+DEFAULT_POLL = 0.5
+MIN_POLL = 0.05
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class WaitEngine:
+    """
+    Derive explicit-wait timeouts and poll intervals from observed latency.
+    
+    Resolve times are recorded per platform (a browserstack.yml platform key,
+    or ``local``) and locator key, which includes the wait condition. Unless
+    one is fixed at construction, callers pass the platform of the driver
+    they wait on, so one process can run several platforms; it defaults to
+    Config.get_platform_name(). Once a locator has ``Config.WAIT_MIN_SAMPLES``
+    samples its timeout becomes the ``Config.WAIT_PERCENTILE`` latency times
+    ``Config.WAIT_SAFETY_FACTOR``, clamped between ``Config.WAIT_MIN_TIMEOUT``
+    and ``Config.EXPLICIT_WAIT``; fast locators also get a shorter poll.
+    Waits that time out are counted but never become samples: how long the
+    element would have taken is unknown.
+    """
+    
+    def __init__(self, platform: str = None, history_file: Path = None, cold_start: bool = None):
+        self._platform = platform
+        self.history_file = Path(history_file or Config.WAIT_HISTORY_FILE)
+        self.cold_start = Config.WAIT_COLD_START if cold_start is None else cold_start
+        self._lock = threading.Lock()
+        self._history: Dict[str, Dict[str, List[float]]] = self._load()
+        self._new_samples: Dict[str, Dict[str, List[float]]] = {}
+        # Timed-out waits per (platform, locator) this run
+        self._timeouts: Dict[Tuple[str, str], int] = {}
+    
+    @property
+    def platform(self) -> str:
+        """Platform whose samples are used and recorded when the caller names none."""
+        return self._platform or Config.get_platform_name()
+    
+    def _resolve(self, platform: Optional[str]) -> str:
+        """Platform to use for a caller's platform: the fixed one, else the caller's, else the default."""
+        return self._platform or platform or self.platform
+    
+    def platforms(self) -> List[str]:
+        """Platforms with samples or timeouts."""
+        names = set(self._history) | set(self._new_samples) | {platform for platform, _ in self._timeouts}
+        return sorted(names)
+    
+    def _load(self) -> Dict[str, Dict[str, List[float]]]:
+        """Load the latency history file, tolerating a missing or corrupt file."""
+        try:
+            return json.loads(self.history_file.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable wait history {self.history_file}: {e}")
+            return {}
+    
+    def _samples(self, locator: str, platform: str = None) -> List[float]:
+        """All known samples for a locator on a platform."""
+        platform = self._resolve(platform)
+        return (
+            self._history.get(platform, {}).get(locator, [])
+            + self._new_samples.get(platform, {}).get(locator, [])
+        )
+    
+    def record(self, locator: str, seconds: float, platform: str = None):
+        """Record how long a locator took to resolve."""
+        platform = self._resolve(platform)
+        with self._lock:
+            self._new_samples.setdefault(platform, {}).setdefault(locator, []).append(round(seconds, 4))
+    
+    def record_timeout(self, locator: str, platform: str = None):
+        """Count a wait that timed out; it is reported but not kept as a sample."""
+        key = (self._resolve(platform), locator)
+        with self._lock:
+            self._timeouts[key] = self._timeouts.get(key, 0) + 1
+    
+    def timeout_for(self, locator: str, platform: str = None) -> float:
+        """Get the explicit-wait timeout to use for a locator."""
+        samples = self._samples(locator, platform)
+        if self.cold_start or len(samples) < Config.WAIT_MIN_SAMPLES:
+            return Config.EXPLICIT_WAIT
+        learned = percentile(samples, Config.WAIT_PERCENTILE) * Config.WAIT_SAFETY_FACTOR
+        return min(max(learned, Config.WAIT_MIN_TIMEOUT), Config.EXPLICIT_WAIT)
+    
+    def poll_for(self, locator: str, platform: str = None) -> float:
+        """Get the poll interval to use for a locator."""
+        samples = self._samples(locator, platform)
+        if self.cold_start or len(samples) < Config.WAIT_MIN_SAMPLES:
+            return DEFAULT_POLL
+        # Poll a few times within the typical resolve time
+        return min(max(percentile(samples, 50) / 4, MIN_POLL), DEFAULT_POLL)
+    
+    def save(self):
+        """
+        Merge this process's samples into the history file.
+        
+        The file is re-read before writing so concurrent xdist workers mostly
+        keep each other's samples, and replaced atomically so readers never
+        see a partial file.
+        """
+        with self._lock:
+            if not self._new_samples:
+                return
+            history = self._load()
+            for platform, new_samples in self._new_samples.items():
+                platform_history = history.setdefault(platform, {})
+                for locator, samples in new_samples.items():
+                    merged = platform_history.get(locator, []) + samples
+                    platform_history[locator] = merged[-Config.WAIT_HISTORY_SIZE:]
+            
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.history_file.with_name(f"{self.history_file.name}.{os.getpid()}.tmp")
+            tmp_file.write_text(json.dumps(history, indent=2, sort_keys=True))
+            os.replace(tmp_file, self.history_file)
+            
+            self._history = history
+            self._new_samples = {}
+        logger.debug(f"Wait history saved: {self.history_file}")
+    
+    def report(self, platform: str = None) -> Dict[str, Dict[str, float]]:
+        """Get the learned values for every locator on a platform."""
+        platform = self._resolve(platform)
+        locators = set(self._history.get(platform, {})) | set(self._new_samples.get(platform, {}))
+        locators |= {locator for p, locator in self._timeouts if p == platform}
+        report = {}
+        for locator in sorted(locators):
+            samples = self._samples(locator, platform)
+            values = {"samples": len(samples)}
+            if samples:
+                values["p50"] = percentile(samples, 50)
+                values[f"p{Config.WAIT_PERCENTILE:g}"] = percentile(samples, Config.WAIT_PERCENTILE)
+            values.update({
+                "timeout": round(self.timeout_for(locator, platform), 3),
+                "poll": round(self.poll_for(locator, platform), 3),
+                "timeouts": self._timeouts.get((platform, locator), 0),
+            })
+            report[locator] = values
+        return report
+
+
+_engine: Optional[WaitEngine] = None
+
+
+def get_wait_engine() -> WaitEngine:
+    """Get the process-wide wait engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        _engine = WaitEngine()
+    return _engine
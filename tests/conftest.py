@@ -1,53 +1,447 @@
 """Pytest configuration for Demo tests."""
 
 import pytest
+import json
 import logging
+import math
+import os
 from pathlib import Path
 
 from src.demo.config.config import Config
+from src.demo.pages.base_page import take_cache_counts
+from src.demo.utils.circuit_breaker import SessionCircuitOpen
+from src.demo.utils.command_recorder import CommandRecorder, install_command_recorder
 from src.demo.utils.driver_factory import DriverFactory
-from src.demo.utils.logger import setup_logger
+from src.demo.utils.driver_pool import DriverPool
+from src.demo.utils.duration_history import DurationHistory
+from src.demo.utils.logger import set_log_context, setup_logger, stop_logger
+from src.demo.utils.network_profiles import apply_network_profile
+from src.demo.utils.screenshot_service import flush_screenshot_service, get_screenshot_service, prune_screenshot_stores
+from src.demo.utils.status_reporter import flush_status_reporter
+from src.demo.utils.steps import take_step_records
+from src.demo.utils.wait_engine import get_wait_engine
 
-# Create necessary directories
-Config.create_directories()
-
-# Setup logging
-setup_logger()
 logger = logging.getLogger(__name__)
 
+# Per-test WebDriver command summaries, collected from (worker) reports
+_command_summaries = {}
+
+# Per-test (platform, seconds) and per-worker busy seconds, collected from (worker) reports
+_test_durations = {}
+_worker_seconds = {}
+
+# Per-test step records, collected from (worker) reports
+_step_records = {}
+
+# Per-test element cache hits and misses, collected from (worker) reports
+_cache_counts = {}
+
+# Longest-first xdist scheduler, when --schedule-by-duration is used
+_scheduler = None
+
+
+def pytest_addoption(parser):
+    """Add Demo command line options."""
+    group = parser.getgroup("demo")
+    group.addoption(
+        "--wait-cold-start",
+        action="store_true",
+        help="Ignore learned wait timeouts and use Config.EXPLICIT_WAIT",
+    )
+    group.addoption(
+        "--command-log",
+        action="store_true",
+        help="Record every WebDriver command and write per-test timelines to reports/",
+    )
+    group.addoption(
+        "--command-budget",
+        choices=["fail", "warn", "off"],
+        default="fail",
+        help="What to do when a test exceeds its command_budget marker",
+    )
+    group.addoption(
+        "--record-command-budgets",
+        action="store_true",
+        help="Record observed command counts as budgets in Config.COMMAND_BUDGET_FILE",
+    )
+    group.addoption(
+        "--platforms",
+        default=Config.PLATFORMS,
+        help="Comma-separated browserstack.yml platform keys, or 'all', to run every test on "
+             "each platform in one session (default: only BROWSER_TYPE)",
+    )
+    group.addoption(
+        "--schedule-by-duration",
+        action="store_true",
+        help="Under xdist, run the longest tests first using Config.DURATION_HISTORY_FILE, "
+             "keeping tests that share a pooled session or login on one worker",
+    )
+    group.addoption(
+        "--session-breaker",
+        choices=["error", "skip", "off"],
+        default="error",
+        help="What remaining tests do once repeated session creation failures open the circuit",
+    )
+    group.addoption(
+        "--wait-report",
+        action="store_true",
+        help="Show learned per-locator wait timeouts after the run",
+    )
+
 
 def pytest_configure(config):
-    """Configure pytest with custom markers."""
+    """Configure pytest with custom markers, logging and output directories."""
+    Config.create_directories()
+    setup_logger()
+    
     config.addinivalue_line("markers", "smoke: mark test as a smoke test")
     config.addinivalue_line("markers", "regression: mark test as a regression test")
     config.addinivalue_line("markers", "critical: mark test as critical")
+    config.addinivalue_line(
+        "markers",
+        "command_budget(max_commands=None, max_remote_seconds=None): limit WebDriver "
+        "commands per test; without arguments the recorded baseline is used",
+    )
+    config.addinivalue_line(
+        "markers",
+        "network_profile(name): CDP network profile for local Chrome (default: Config.NETWORK_PROFILE)",
+    )
+    
+    if config.getoption("--wait-cold-start"):
+        get_wait_engine().cold_start = True
+    if config.getoption("--command-log"):
+        Config.COMMAND_LOG = True
+    if config.getoption("--session-breaker") == "off":
+        Config.SESSION_BREAKER_THRESHOLD = 0
+    
+    # Start a fresh record of this run's BrowserStack sessions (workers append to it) and circuit
+    # state, and drop screenshot stores of other builds (a local run is a build of its own)
+    if not hasattr(config, "workerinput"):
+        Config.SESSION_RECORD_FILE.unlink(missing_ok=True)
+        Config.SESSION_BREAKER_FILE.unlink(missing_ok=True)
+        prune_screenshot_stores(keep=os.environ.get("BUILD_NUMBER"))
+    
+    # Pre-warm sessions only where tests run: xdist workers or a plain run
+    is_xdist_controller = not hasattr(config, "workerinput") and getattr(config.option, "numprocesses", None)
+    if not is_xdist_controller:
+        DriverFactory.start_prefetch()
+
+
+def pytest_unconfigure(config):
+    """Flush queued log records."""
+    stop_logger()
+
+
+def pytest_runtest_logstart(nodeid, location):
+    """Tag log records with the running test and start its step records and cache counters."""
+    set_log_context(nodeid=nodeid, session_id=None)
+    take_step_records()
+    take_cache_counts()
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    """Stop tagging log records with the finished test."""
+    set_log_context(nodeid=None, session_id=None)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Release driver resources, send queued statuses and screenshots, persist waits and command budgets."""
+    DriverFactory.stop_prefetch()
+    DriverFactory.stop_chrome_service()
+    flush_status_reporter()
+    flush_screenshot_service()
+    
+    try:
+        get_wait_engine().save()
+    except OSError as e:
+        logger.error(f"Failed to save wait history: {e}")
+    
+    # Only the controller sees every test's summary under xdist
+    if hasattr(session.config, "workerinput"):
+        return
+    if session.config.getoption("--record-command-budgets"):
+        _save_command_budgets(_command_summaries)
+    
+    history = DurationHistory()
+    for nodeid, (platform, seconds) in _test_durations.items():
+        if platform is not None:
+            history.record(platform, nodeid, seconds)
+    try:
+        history.save()
+    except OSError as e:
+        logger.error(f"Failed to save duration history: {e}")
+
+
+@pytest.hookimpl(tryfirst=True, optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Use longest-first scheduling for the default load distribution when requested."""
+    global _scheduler
+    if not config.getoption("--schedule-by-duration") or config.getvalue("dist") != "load":
+        return None
+    from src.demo.utils.lpt_scheduler import LongestFirstScheduling
+    
+    _scheduler = LongestFirstScheduling(config, log)
+    return _scheduler
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize driver-using tests across the selected platforms."""
+    selected = metafunc.config.getoption("--platforms")
+    if not selected or "platform" not in metafunc.fixturenames:
+        return
+    
+    platforms = list(Config.get_platforms())
+    if selected != "all":
+        requested = [key.strip() for key in selected.split(",") if key.strip()]
+        unknown = sorted(set(requested) - set(platforms))
+        if unknown:
+            raise pytest.UsageError(f"Unknown platforms {unknown}; {Config.PLATFORMS_FILE} defines {platforms}")
+        platforms = requested
+    metafunc.parametrize("platform", platforms, indirect=True, ids=platforms)
+
+
+def _load_command_budgets() -> dict:
+    """Load recorded command budgets keyed by test nodeid and platform."""
+    try:
+        return json.loads(Config.COMMAND_BUDGET_FILE.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def _save_command_budgets(summaries: dict):
+    """Record observed command usage, plus headroom, as per-test budgets."""
+    budgets = _load_command_budgets()
+    for nodeid, summary in summaries.items():
+        platform = summary.get("platform", Config.get_platform_name())
+        budgets.setdefault(nodeid, {})[platform] = {
+            "max_commands": math.ceil(summary["commands"] * Config.COMMAND_BUDGET_HEADROOM),
+            "max_remote_seconds": round(summary["remote_seconds"] * Config.COMMAND_BUDGET_HEADROOM, 1),
+        }
+    Config.COMMAND_BUDGET_FILE.write_text(json.dumps(budgets, indent=2, sort_keys=True) + "\n")
+    logger.info(f"Recorded command budgets for {len(summaries)} tests: {Config.COMMAND_BUDGET_FILE}")
+
+
+def _get_command_budget(item):
+    """Get the effective command budget for a test, if it has one."""
+    marker = item.get_closest_marker("command_budget")
+    if marker is None:
+        return None
+    platform = Config.get_platform_name(item.funcargs.get("platform"))
+    budget = dict(_load_command_budgets().get(item.nodeid, {}).get(platform, {}))
+    budget.update({k: v for k, v in marker.kwargs.items() if v is not None})
+    return budget or None
+
+
+def _check_command_budget(item, report):
+    """Fail or warn when a passed test issued more commands than budgeted."""
+    mode = item.config.getoption("--command-budget")
+    budget = _get_command_budget(item)
+    recorder = getattr(item.funcargs.get("driver"), "command_recorder", None)
+    if mode == "off" or not budget or recorder is None:
+        return
+    
+    summary = CommandRecorder.summarize(recorder.records)
+    violations = []
+    if budget.get("max_commands") is not None and summary["commands"] > budget["max_commands"]:
+        violations.append(f"{summary['commands']} commands > {budget['max_commands']}")
+    if budget.get("max_remote_seconds") is not None and summary["remote_seconds"] > budget["max_remote_seconds"]:
+        violations.append(f"{summary['remote_seconds']:.1f}s remote > {budget['max_remote_seconds']}s")
+    if not violations:
+        return
+    
+    message = f"WebDriver command budget exceeded: {'; '.join(violations)}"
+    if mode == "warn":
+        item.warn(pytest.PytestWarning(message))
+    else:
+        report.outcome = "failed"
+        report.longrepr = message
+
+
+def pytest_runtest_logreport(report):
+    """Collect command summaries, steps, cache counts and durations, including those from xdist workers."""
+    properties = dict(report.user_properties)
+    if "webdriver_commands" in properties:
+        _command_summaries[report.nodeid] = properties["webdriver_commands"]
+    if "steps" in properties:
+        _step_records[report.nodeid] = properties["steps"]
+    if "element_cache" in properties:
+        _cache_counts[report.nodeid] = properties["element_cache"]
+    
+    # Skipped tests say nothing about how long the test takes
+    platform, seconds = _test_durations.get(
+        report.nodeid, (properties.get("platform", Config.get_platform_name()), 0.0)
+    )
+    _test_durations[report.nodeid] = (None if report.skipped else platform, seconds + report.duration)
+    
+    node = getattr(report, "node", None)
+    worker = node.gateway.id if node is not None else "main"
+    _worker_seconds[worker] = _worker_seconds.get(worker, 0.0) + report.duration
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Report command summaries, cache hits, step retries, breaker trips, the duration schedule and learned waits."""
+    if _command_summaries:
+        terminalreporter.section("webdriver commands")
+        for nodeid, summary in _command_summaries.items():
+            slowest = ", ".join(
+                f"{s['command']} {s['duration']:.3f}s ({s['caller'] or 'test'})" for s in summary["slowest"]
+            )
+            terminalreporter.write_line(
+                f"{nodeid}: {summary['commands']} commands, "
+                f"{summary['remote_seconds']:.3f}s remote; slowest: {slowest}"
+            )
+    
+    if _cache_counts:
+        terminalreporter.section("element cache")
+        for nodeid, counts in _cache_counts.items():
+            lookups = counts["hits"] + counts["misses"]
+            terminalreporter.write_line(
+                f"{nodeid}: {counts['hits']} hits, {counts['misses']} misses "
+                f"({counts['hits'] / lookups:.0%} hit rate)"
+            )
+    
+    retried = {
+        nodeid: [record for record in records if record["attempts"] > 1 or record["status"] == "failed"]
+        for nodeid, records in _step_records.items()
+    }
+    retried = {nodeid: records for nodeid, records in retried.items() if records}
+    if retried:
+        terminalreporter.section("step retries")
+        for nodeid, records in retried.items():
+            steps = ", ".join(
+                f"{r['name']} {r['status']} after {r['attempts']} attempt(s)"
+                + (f" ({r['error']})" if r.get("error") else "")
+                for r in records
+            )
+            terminalreporter.write_line(f"{nodeid}: {steps}")
+    
+    try:
+        breaker = json.loads(Config.SESSION_BREAKER_FILE.read_text())
+    except (OSError, ValueError):
+        breaker = {}
+    if breaker.get("opened"):
+        terminalreporter.section("session circuit breaker")
+        terminalreporter.write_line(
+            f"opened {breaker['opened']} time(s), finished {breaker.get('state')}; "
+            f"last error: {breaker.get('last_error')}"
+        )
+    
+    if _scheduler is not None and _scheduler.prediction is not None:
+        predicted, predicted_loads = _scheduler.prediction
+        actual = max(_worker_seconds.values(), default=0.0)
+        terminalreporter.section("duration schedule")
+        terminalreporter.write_line(
+            f"makespan: predicted {predicted:.1f}s, actual {actual:.1f}s "
+            f"({actual - predicted:+.1f}s) over {len(predicted_loads)} workers"
+        )
+        terminalreporter.write_line(
+            "predicted worker loads: " + ", ".join(f"{load:.1f}s" for load in predicted_loads)
+        )
+        terminalreporter.write_line(
+            "actual worker loads: " + ", ".join(
+                f"{worker} {seconds:.1f}s" for worker, seconds in sorted(_worker_seconds.items())
+            )
+        )
+    
+    if not config.getoption("--wait-report"):
+        return
+    
+    engine = get_wait_engine()
+    for platform in engine.platforms():
+        terminalreporter.section(f"learned waits ({platform})")
+        for locator, values in engine.report(platform).items():
+            stats = ", ".join(f"{k}={v}" for k, v in values.items())
+            terminalreporter.write_line(f"{locator}: {stats}")
+
+
+@pytest.fixture(scope="session")
+def driver_pool():
+    """Per-worker pool of reusable driver sessions, if pooling is enabled."""
+    if not Config.DRIVER_POOL:
+        yield None
+        return
+    
+    pool = DriverPool()
+    yield pool
+    pool.close_all()
+
+
+@pytest.fixture
+def platform(request):
+    """
+    Platform key under test.
+    
+    Parametrized by --platforms; otherwise Config.BROWSER_TYPE. The key is
+    passed to the driver factory or pool, and the driver carries it to page
+    objects, so per-platform state (wait history, login snapshots, command
+    budgets) follows the test's platform without changing shared Config.
+    """
+    platform = getattr(request, "param", Config.BROWSER_TYPE)
+    # Duration history is kept per platform
+    request.node.user_properties.append(("platform", Config.get_platform_name(platform)))
+    return platform
 
 
 @pytest.fixture(scope="function")
-def driver(request):
+def driver(request, driver_pool, platform):
     """
     Setup and teardown WebDriver for each test.
     
     This fixture:
-    - Creates appropriate driver (BrowserStack or local)
+    - Creates appropriate driver (BrowserStack or local), or takes a warm
+      session from the driver pool when Config.DRIVER_POOL is enabled
     - Handles cleanup after test
     - Logs test execution details
     """
     test_name = request.node.name
     logger.info(f"Starting test: {test_name}")
     
-    # Create driver
-    driver = DriverFactory.create_driver()
+    # Create driver; budgets and budget recording need the command recorder
+    record_commands = (
+        Config.COMMAND_LOG
+        or request.node.get_closest_marker("command_budget") is not None
+        or request.config.getoption("--record-command-budgets")
+    )
+    try:
+        if driver_pool:
+            driver = driver_pool.acquire(platform)
+            if record_commands and not hasattr(driver, "command_recorder"):
+                install_command_recorder(driver)
+        else:
+            driver = DriverFactory.create_driver(record_commands=record_commands, browser_type=platform)
+    except SessionCircuitOpen as e:
+        if request.config.getoption("--session-breaker") == "skip":
+            pytest.skip(str(e))
+        pytest.fail(str(e), pytrace=False)
+    
+    # Network profile (local Chrome only; reapplied on reused sessions)
+    marker = request.node.get_closest_marker("network_profile")
+    apply_network_profile(driver, marker.args[0] if marker else Config.NETWORK_PROFILE)
     
     # Log session details
     if hasattr(driver, 'session_id'):
+        set_log_context(session_id=driver.session_id)
         logger.info(f"Session ID: {driver.session_id}")
     
     yield driver
     
+    # Command timeline
+    recorder = getattr(driver, "command_recorder", None)
+    if recorder:
+        records = recorder.drain()
+        if Config.COMMAND_LOG:
+            CommandRecorder.write_timeline(request.node.nodeid, records)
+        summary = CommandRecorder.summarize(records)
+        summary["platform"] = Config.get_platform_name(platform)
+        request.node.user_properties.append(("webdriver_commands", summary))
+    
     # Cleanup
     try:
-        driver.quit()
+        if driver_pool:
+            rep_call = getattr(request.node, "rep_call", None)
+            driver_pool.release(driver, failed=rep_call is None or rep_call.failed)
+        else:
+            driver.quit()
         logger.info(f"Test completed: {test_name}")
     except Exception as e:
         logger.error(f"Error during driver cleanup: {e}")
@@ -73,16 +467,31 @@ def pytest_runtest_makereport(item, call):
     outcome = yield
     report = outcome.get_result()
     
+    # Expose phase results to fixtures (e.g. to retire failed pooled sessions)
+    setattr(item, f"rep_{report.when}", report)
+    
+    # Step outcomes, retry counts and element cache savings go into the reports (and junit properties)
+    if report.when == "call":
+        steps = take_step_records()
+        if steps:
+            item.user_properties.append(("steps", steps))
+            report.user_properties.append(("steps", steps))
+        cache_counts = take_cache_counts()
+        if any(cache_counts.values()):
+            item.user_properties.append(("element_cache", cache_counts))
+            report.user_properties.append(("element_cache", cache_counts))
+    
     if report.when == "call" and report.failed:
         # Get the driver from the test
         driver = item.funcargs.get('driver')
         if driver:
-            # Take screenshot
-            screenshot_name = f"{item.nodeid.replace('::', '_').replace('/', '_')}.png"
-            screenshot_path = Config.SCREENSHOTS_DIR / screenshot_name
+            # Take screenshot; it is written in the background
+            screenshot_name = item.nodeid.replace('::', '_').replace('/', '_')
             
             try:
-                driver.save_screenshot(str(screenshot_path))
-                logger.info(f"Screenshot saved: {screenshot_path}")
+                get_screenshot_service().capture(driver, screenshot_name)
             except Exception as e:
-                logger.error(f"Failed to capture screenshot: {e}")
\ No newline at end of file
+                logger.error(f"Failed to capture screenshot: {e}")
+    
+    if report.when == "call" and report.passed:
+        _check_command_budget(item, report)
\ No newline at end of file
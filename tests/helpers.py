@@ -0,0 +1,25 @@
+"""Shared stubs for the Demo unit tests."""
+
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+
+class FakeSession:
+    """Session stub that can be ended by the hub; pings can be made slow."""
+    
+    def __init__(self, session_id: str, alive: bool = True, ping_delay: float = 0):
+        self.session_id = session_id
+        self.alive = alive
+        self.ping_delay = ping_delay
+        self.quit_called = False
+    
+    @property
+    def current_url(self):
+        time.sleep(self.ping_delay)
+        if not self.alive:
+            raise WebDriverException("session deleted")
+        return "about:blank"
+    
+    def quit(self):
+        self.quit_called = True
@@ -5,8 +5,8 @@ import logging
 from pathlib import Path
 from typing import Optional
 
-from src.demo.config.config import Config
-from src.demo.utils.browserstack_api import BrowserStackAPI
+from src.demo.utils.screenshot_service import get_screenshot_service
+from src.demo.utils.status_reporter import get_status_reporter
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +15,6 @@ class TestBase:
     """Base test class with common functionality for Demo tests."""
     
     driver = None
-    browserstack_api = None
     test_passed = True
     failure_reason = None
     
@@ -24,7 +23,6 @@ class TestBase:
         """Setup and teardown for each test method."""
         self.driver = driver
         self.test_name = request.node.name
-        self.browserstack_api = BrowserStackAPI()
         
         # Reset test status
         self.test_passed = True
@@ -54,25 +52,29 @@ class TestBase:
         return any(indicator in capabilities for indicator in browserstack_indicators)
     
     def _update_browserstack_status(self):
-        """Update BrowserStack session status based on test outcome."""
-        if not self.browserstack_api or not hasattr(self.driver, 'session_id'):
+        """Queue the BrowserStack session status; it is sent in the background."""
+        if not hasattr(self.driver, 'session_id'):
             return
         
-        session_id = self.driver.session_id
-        
         if self.test_passed:
-            self.browserstack_api.update_session_status(
-                session_id,
+            get_status_reporter().submit(
+                self.driver.session_id,
                 "passed",
                 f"Test {self.test_name} passed"
             )
         else:
-            self.browserstack_api.update_session_status(
-                session_id,
+            get_status_reporter().submit(
+                self.driver.session_id,
                 "failed",
                 self.failure_reason or f"Test {self.test_name} failed"
             )
     
+    def mark_test_passed(self, reason: str):
+        """Mark the current test as passed."""
+        self.test_passed = True
+        self.failure_reason = None
+        logger.info(f"Test marked as passed: {reason}")
+    
     def mark_test_failed(self, reason: str):
         """Mark the current test as failed."""
         self.test_passed = False
@@ -80,12 +82,14 @@ class TestBase:
         logger.error(f"Test marked as failed: {reason}")
     
     def take_screenshot(self, name: str) -> Optional[Path]:
-        """Take a screenshot for debugging."""
+        """
+        Take a screenshot for debugging.
+        
+        The file is written in the background, so the returned path may not
+        exist yet, or at all if the build's screenshot budget is used up.
+        """
         try:
-            screenshot_path = Config.SCREENSHOTS_DIR / f"{self.test_name}_{name}.png"
-            self.driver.save_screenshot(str(screenshot_path))
-            logger.info(f"Screenshot saved: {screenshot_path}")
-            return screenshot_path
+            return get_screenshot_service().capture(self.driver, f"{self.test_name}_{name}")
         except Exception as e:
             logger.error(f"Failed to take screenshot: {e}")
             return None
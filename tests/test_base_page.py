@@ -0,0 +1,135 @@
+"""Tests for BasePage element caching and waits against a fake driver."""
+
+import time
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+
+from src.demo.config.config import Config
+from src.demo.pages import base_page
+from src.demo.pages.base_page import BasePage, take_cache_counts
+from src.demo.utils.wait_engine import WaitEngine
+
+
+class FakeElement:
+    """Element stub that can be made stale."""
+    
+    def __init__(self):
+        self.stale = False
+    
+    def _check(self):
+        if self.stale:
+            raise StaleElementReferenceException("stale")
+    
+    def is_displayed(self):
+        self._check()
+        return True
+    
+    def is_enabled(self):
+        self._check()
+        return True
+
+
+class FakeDriver:
+    """Driver stub whose find_element returns a new element per lookup."""
+    
+    def __init__(self):
+        self.lookups = 0
+        self.elements = []
+    
+    def find_element(self, by, value):
+        self.lookups += 1
+        self.elements.append(FakeElement())
+        return self.elements[-1]
+
+
+@pytest.fixture
+def page(tmp_path, monkeypatch):
+    engine = WaitEngine(platform="local", history_file=tmp_path / "waits.json")
+    monkeypatch.setattr(base_page, "get_wait_engine", lambda: engine)
+    take_cache_counts()
+    return BasePage(FakeDriver())
+
+
+def test_cached_handles_are_validated_before_reuse(page):
+    first = page.find_clickable_element(By.ID, "buy")
+    assert page.find_clickable_element(By.ID, "buy") is first
+    
+    first.stale = True
+    second = page.find_clickable_element(By.ID, "buy")
+    assert second is not first
+    
+    assert page.find_element(By.ID, "buy") is second  # Clickable handles also serve presence lookups
+    assert page.driver.lookups == 2
+    assert take_cache_counts() == {"hits": 2, "misses": 2}
+
+
+def test_snapshot_rejects_unsupported_locators(page):
+    with pytest.raises(ValueError, match="link text"):
+        page.snapshot_elements(By.LINK_TEXT, "Favourites")
+
+
+class SlowDriver(FakeDriver):
+    """Driver stub whose element only appears ``delay`` seconds after the first lookup."""
+    
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.appears_at = None
+    
+    def find_element(self, by, value):
+        if self.appears_at is None:
+            self.appears_at = time.monotonic() + self.delay
+        if time.monotonic() < self.appears_at:
+            raise NoSuchElementException(value)
+        return super().find_element(by, value)
+
+
+def test_short_learned_timeout_is_extended_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "EXPLICIT_WAIT", 2)
+    monkeypatch.setattr(Config, "WAIT_MIN_TIMEOUT", 0.1)
+    key = "presence_of_element_located:id=slow"
+    engine = WaitEngine(platform="local", history_file=tmp_path / "waits.json", cold_start=False)
+    for _ in range(5):
+        engine.record(key, 0.01)
+    monkeypatch.setattr(base_page, "get_wait_engine", lambda: engine)
+    assert engine.timeout_for(key) == 0.1
+    
+    BasePage(SlowDriver(delay=0.15)).find_element(By.ID, "slow")
+    assert engine._new_samples["local"][key][-1] >= 0.15
+    
+    # A real failure costs the learned timeout and one extension, not Config.EXPLICIT_WAIT
+    timeout = engine.timeout_for(key)
+    start = time.monotonic()
+    with pytest.raises(TimeoutException):
+        BasePage(SlowDriver(delay=10)).find_element(By.ID, "slow")
+    assert time.monotonic() - start < 2 * timeout + 0.5 < Config.EXPLICIT_WAIT
+    assert len(engine._new_samples["local"][key]) == 6
+    assert engine.report()[key]["timeouts"] == 1
+    assert list(engine.report()) == [key]
+
+
+def test_visibility_and_absence_checks_use_the_negative_budget(page, monkeypatch):
+    monkeypatch.setattr(Config, "EXPLICIT_WAIT", 5)
+    monkeypatch.setattr(Config, "NEGATIVE_CHECK_TIMEOUT", 0.5)
+    
+    assert BasePage(SlowDriver(delay=0.2)).is_element_visible(By.ID, "slow")
+    
+    start = time.monotonic()
+    assert not BasePage(SlowDriver(delay=10)).is_element_visible(By.ID, "missing")
+    assert not BasePage(FakeDriver()).is_element_absent(By.ID, "shown")
+    assert time.monotonic() - start < 1.5
+    assert base_page.get_wait_engine().report() == {}  # Expected misses never reach the wait history
+
+
+def test_waits_are_learned_per_driver_platform(tmp_path, monkeypatch):
+    engine = WaitEngine(history_file=tmp_path / "waits.json")
+    monkeypatch.setattr(base_page, "get_wait_engine", lambda: engine)
+    driver = FakeDriver()
+    driver.platform_name = "safari_osx"
+    
+    BasePage(driver).find_element(By.ID, "buy")
+    
+    assert engine.platforms() == ["safari_osx"]
+    assert list(engine.report("safari_osx")) == ["presence_of_element_located:id=buy"]
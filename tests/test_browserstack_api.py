@@ -0,0 +1,263 @@
+"""Tests for BrowserStackAPI against a local fake REST server."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.demo.config.config import Config
+from src.demo.utils import rate_limiter
+from src.demo.utils.browserstack_api import BrowserStackAPI, StatusAwareRetry
+from src.demo.utils.rate_limiter import FileTokenBucket
+from src.demo.utils.status_reporter import SessionStatusReporter
+
+
+class FakeRestHandler(BaseHTTPRequestHandler):
+    """Serves queued (status, body, headers) responses per path, then 200s."""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.server.requests.append((self.command, self.path))
+        self.server.conditional.append(self.headers.get("If-None-Match"))
+        
+        queued = self.server.responses.get(self.path.split("?")[0])
+        status, body, headers = queued.pop(0) if queued else (200, {"automation_session": {}}, {})
+        payload = json.dumps(body).encode() if status != 304 else b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    do_GET = do_PUT = _handle
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeRestHandler)
+    server.requests = []
+    server.conditional = []
+    server.responses = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def bucket_file(tmp_path, monkeypatch):
+    path = tmp_path / "api.bucket"
+    monkeypatch.setattr(rate_limiter, "_limiter", FileTokenBucket(path, rate=1000, capacity=10))
+    return path
+
+
+@pytest.fixture
+def api(fake_server, bucket_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "BUILD_CACHE_DIR", tmp_path / "build_cache")
+    monkeypatch.setattr(StatusAwareRetry, "RATE_LIMIT_BACKOFF", 0.01)
+    monkeypatch.setattr(StatusAwareRetry, "NEW_SESSION_BACKOFF", 0.05)
+    monkeypatch.setattr(Config, "BROWSERSTACK_SESSION_WAIT", 0.2)
+    host, port = fake_server.server_address
+    return BrowserStackAPI("user", "key", base_url=f"http://{host}:{port}/automate")
+
+
+def test_calls_reuse_one_connection(api, fake_server):
+    before = BrowserStackAPI.metrics()
+    
+    for _ in range(3):
+        assert api.get_session_details("abc") is not None
+    
+    after = BrowserStackAPI.metrics()
+    assert after["requests"] - before["requests"] == 3
+    assert after["connections_opened"] - before["connections_opened"] == 1
+    assert after["connections_reused"] - before["connections_reused"] == 2
+
+
+def test_status_update_waits_for_session_to_appear(api, fake_server):
+    path = "/automate/sessions/abc.json"
+    fake_server.responses[path] = [(404, {}, {}), (404, {}, {})]
+    before = BrowserStackAPI.metrics()
+    
+    assert api.update_session_status("abc", "passed", "ok")
+    
+    assert fake_server.requests == [("PUT", path)] * 3
+    after = BrowserStackAPI.metrics()
+    assert after["requests"] - before["requests"] == 1
+    assert after["retries"] - before["retries"] == 2
+
+
+def test_missing_session_lookups_fail_fast(api, fake_server):
+    path = "/automate/sessions/gone.json"
+    fake_server.responses[path] = [(404, {}, {})] * 100
+    
+    assert api.get_session_details("gone") is None
+    assert len(fake_server.requests) == 1
+    
+    # Waiting for a new session gives up after Config.BROWSERSTACK_SESSION_WAIT
+    fake_server.requests.clear()
+    start = time.monotonic()
+    assert not api.wait_for_session("gone")
+    assert 0.2 <= time.monotonic() - start < 1
+    assert len(fake_server.requests) == 1 + 4
+
+
+def test_build_endpoints_do_not_retry_not_found(api, fake_server):
+    path = "/automate/builds/b1/sessions.json"
+    fake_server.responses[path] = [(404, {}, {})]
+    
+    assert api.get_build_sessions("b1") is None
+    assert len(fake_server.requests) == 1
+
+
+def test_server_errors_and_rate_limits_are_retried(api, fake_server):
+    path = "/automate/builds/b1/sessions.json"
+    fake_server.responses[path] = [(503, {}, {}), (429, {}, {"Retry-After": "0"}), (200, [{"id": 1}], {})]
+    
+    assert api.get_build_sessions("b1") == [{"id": 1}]
+    assert len(fake_server.requests) == 3
+
+
+def test_build_sessions_stream_pages_lazily(api, fake_server):
+    path = "/automate/builds/b1/sessions.json"
+    fake_server.responses[path] = [(200, [{"id": 1}, {"id": 2}], {}), (200, [{"id": 3}], {})]
+    
+    sessions = api.iter_build_sessions("b1", status="failed", page_size=2)
+    assert next(sessions) == {"id": 1}
+    assert len(fake_server.requests) == 1
+    
+    assert list(sessions) == [{"id": 2}, {"id": 3}]
+    assert [p for _, p in fake_server.requests] == [
+        f"{path}?limit=2&offset=0&status=failed",
+        f"{path}?limit=2&offset=2&status=failed",
+    ]
+
+
+def test_build_sessions_revalidate_cached_pages(api, fake_server):
+    path = "/automate/builds/b1/sessions.json"
+    fake_server.responses[path] = [(200, [{"id": 1}], {"ETag": '"v1"'}), (304, None, {})]
+    
+    assert api.get_build_sessions("b1") == [{"id": 1}]
+    assert api.get_build_sessions("b1") == [{"id": 1}]
+    assert fake_server.conditional == [None, '"v1"']
+
+
+def test_harvest_downloads_failed_session_artifacts(api, fake_server, tmp_path):
+    base = api.base_url
+    fake_server.responses["/automate/sessions/bad.json"] = [(200, {"automation_session": {
+        "hashed_id": "bad", "status": "failed",
+        "logs": f"{base}/logs/bad", "har_logs_url": f"{base}/har/bad",
+    }}, {})]
+    fake_server.responses["/automate/sessions/good.json"] = [(200, {"automation_session": {
+        "hashed_id": "good", "status": "passed", "logs": f"{base}/logs/good",
+    }}, {})]
+    (tmp_path / "bad").mkdir()
+    (tmp_path / "bad" / "network.har").write_text("already here")
+    
+    results = api.harvest_artifacts(session_ids=["bad", "good"], output_dir=tmp_path)
+    
+    assert list(results) == ["bad"]
+    assert sorted(p.name for p in results["bad"]) == ["details.json", "network.har", "text.log"]
+    assert (tmp_path / "bad" / "network.har").read_text() == "already here"
+    assert ("GET", "/automate/logs/bad") in fake_server.requests
+    assert ("GET", "/automate/har/bad") not in fake_server.requests
+
+
+@pytest.mark.parametrize("url, authenticated", [
+    ("https://automate.browserstack.com/sessions/bad/logs", True),
+    ("https://api.browserstack.com/automate/sessions/bad/networklogs", True),
+    ("http://automate.browserstack.com/sessions/bad/logs", False),
+    ("https://bs-stag.s3.amazonaws.com/bad/video.mp4", False),
+])
+def test_artifact_credentials_only_go_to_browserstack_hosts(api, tmp_path, monkeypatch, url, authenticated):
+    class Sent(Exception):
+        pass
+    
+    def send(authenticated_call):
+        def call(*args, **kwargs):
+            raise Sent(authenticated_call)
+        return call
+    
+    monkeypatch.setattr(api, "_request", send(True))
+    monkeypatch.setattr(api.session, "get", send(False))
+    with pytest.raises(Sent) as sent:
+        api.download_artifact(url, tmp_path / "artifact")
+    assert sent.value.args[0] is authenticated
+
+
+def test_retry_after_pauses_every_process(api, fake_server, bucket_file):
+    path = "/automate/builds/b1/sessions.json"
+    fake_server.responses[path] = [(429, {}, {"Retry-After": "1"})]
+    before = BrowserStackAPI.metrics()
+    
+    assert api.get_build_sessions("b1") is not None
+    
+    after = BrowserStackAPI.metrics()
+    assert after["rate_limit_blocks"] - before["rate_limit_blocks"] == 1
+    assert after["rate_limit_wait_seconds"] - before["rate_limit_wait_seconds"] >= 0.9
+    
+    # Another process sharing the bucket file is held off by the block too
+    rate_limiter.get_rate_limiter().block(0.3)
+    other = FileTokenBucket(bucket_file, rate=1000, capacity=10)
+    assert other.acquire() >= 0.2
+
+
+def test_bucket_is_shared_between_instances(tmp_path):
+    path = tmp_path / "api.bucket"
+    first = FileTokenBucket(path, rate=10, capacity=1)
+    second = FileTokenBucket(path, rate=10, capacity=1)
+    
+    start = time.monotonic()
+    for bucket in (first, second, first, second):
+        bucket.acquire()
+    
+    assert time.monotonic() - start >= 0.25
+    assert first.metrics()["rate_limit_waits"] + second.metrics()["rate_limit_waits"] == 3
+
+
+def test_status_reporter_resumes_journal_and_flushes(api, fake_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "SESSION_RECORD_FILE", tmp_path / "sessions.jsonl")
+    journal = tmp_path / "status_queue_main.json"
+    journal.write_text(json.dumps({"old": {"status": "failed", "reason": "crashed run", "attempts": 0}}))
+    
+    reporter = SessionStatusReporter(api, journal)
+    reporter.submit("new", "passed", "ok")
+    
+    assert reporter.flush(timeout=5)
+    assert sorted(fake_server.requests) == [
+        ("PUT", "/automate/sessions/new.json"),
+        ("PUT", "/automate/sessions/old.json"),
+    ]
+    assert not journal.exists()
+
+
+def test_status_reporter_journals_in_flight_update_until_sent(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "SESSION_RECORD_FILE", tmp_path / "sessions.jsonl")
+    journal = tmp_path / "status_queue_main.json"
+    sending, release = threading.Event(), threading.Event()
+    
+    class BlockingApi:
+        def update_session_status(self, session_id, status, reason):
+            sending.set()
+            return release.wait(5)
+    
+    reporter = SessionStatusReporter(BlockingApi(), journal)
+    reporter.submit("first", "failed", "boom")
+    assert sending.wait(5)
+    reporter.submit("second", "passed", "ok")
+    
+    assert set(json.loads(journal.read_text())) == {"first", "second"}
+    release.set()
+    assert reporter.flush(timeout=5)
+    assert not journal.exists()
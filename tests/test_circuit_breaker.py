@@ -0,0 +1,102 @@
+"""Tests for the cross-process session circuit breaker."""
+
+import time
+
+import pytest
+
+from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
+from urllib3.exceptions import MaxRetryError
+
+from src.demo.utils.circuit_breaker import SessionCircuitBreaker, SessionCircuitOpen, is_session_outage
+
+
+def make_breaker(path, threshold=2, window=60, cooldown=0.2, probe_timeout=5):
+    return SessionCircuitBreaker(path, threshold, window, cooldown, probe_timeout)
+
+
+def test_opens_for_every_worker_and_half_opens_with_a_single_probe(tmp_path):
+    state_file = tmp_path / "breaker.json"
+    worker_a, worker_b = make_breaker(state_file), make_breaker(state_file)
+    
+    worker_a.record_failure(ConnectionError("hub unreachable"))
+    worker_b.before_attempt()
+    worker_b.record_failure(ConnectionError("hub unreachable"))
+    
+    with pytest.raises(SessionCircuitOpen, match="hub unreachable"):
+        worker_a.before_attempt()
+    
+    time.sleep(0.25)
+    probe = worker_a.before_attempt()
+    with pytest.raises(SessionCircuitOpen, match="probe is in progress"):
+        worker_b.before_attempt()
+    
+    worker_a.record_failure(ConnectionError("still down"), probe)
+    with pytest.raises(SessionCircuitOpen, match="still down"):
+        worker_b.before_attempt()
+    
+    time.sleep(0.25)
+    probe = worker_b.before_attempt()
+    worker_b.record_success(probe)
+    worker_a.before_attempt()
+    assert worker_a.snapshot()["state"] == "closed"
+    assert worker_a.snapshot()["opened"] == 2
+
+
+def test_success_or_quiet_window_resets_consecutive_failures(tmp_path):
+    breaker = make_breaker(tmp_path / "breaker.json", window=0.1)
+    
+    breaker.record_failure(ConnectionError())
+    breaker.record_success()
+    breaker.record_failure(ConnectionError())
+    breaker.before_attempt()
+    
+    time.sleep(0.15)
+    breaker.record_failure(ConnectionError())
+    breaker.before_attempt()
+    assert breaker.snapshot()["state"] == "closed"
+
+
+def test_only_the_probe_failing_reopens_the_circuit(tmp_path):
+    breaker = make_breaker(tmp_path / "breaker.json")
+    breaker.record_failure(ConnectionError())
+    breaker.record_failure(ConnectionError())
+    
+    time.sleep(0.25)
+    probe = breaker.before_attempt()
+    assert probe
+    breaker.record_failure(ConnectionError("started before the circuit opened"))
+    assert breaker.snapshot()["state"] == "half_open"
+    
+    breaker.record_success()
+    assert breaker.snapshot()["state"] == "half_open"
+    
+    breaker.record_failure(ConnectionError("probe failed"), probe)
+    assert breaker.snapshot()["state"] == "open"
+
+
+def test_probe_failing_for_another_reason_lets_the_next_caller_probe(tmp_path):
+    breaker = make_breaker(tmp_path / "breaker.json")
+    breaker.record_failure(ConnectionError())
+    breaker.record_failure(ConnectionError())
+    
+    time.sleep(0.25)
+    probe = breaker.before_attempt()
+    breaker.release_probe(probe)
+    assert breaker.snapshot()["state"] == "half_open"
+    
+    assert breaker.before_attempt() not in (None, probe)
+
+
+@pytest.mark.parametrize("error, status, outage", [
+    (ConnectionError("refused"), None, True),
+    (TimeoutError(), None, True),
+    (MaxRetryError(None, "/wd/hub/session"), None, True),
+    (WebDriverException("<html><h1>502 Bad Gateway</h1></html>"), 502, True),
+    (WebDriverException("Authorization Required"), 401, True),
+    (SessionNotCreatedException("Invalid username or access key"), None, True),
+    (SessionNotCreatedException("All parallel tests are currently in use"), 500, False),
+    (SessionNotCreatedException("Could not start session 4031a2f on port 4010"), None, False),
+    (ValueError("bad capabilities"), None, False),
+])
+def test_only_hub_and_auth_failures_count_as_outages(error, status, outage):
+    assert is_session_outage(error, status) is outage
@@ -0,0 +1,25 @@
+"""Tests for the pooled session keepalive."""
+
+import threading
+import time
+
+from src.demo.utils.driver_pool import DriverPool
+
+from .helpers import FakeSession
+
+
+def test_keepalive_retires_dead_sessions_without_holding_the_lock():
+    pool = DriverPool(max_uses=5, keepalive_interval=0.05)
+    live, dead = FakeSession("live", ping_delay=0.2), FakeSession("dead", alive=False)
+    with pool._lock:
+        pool._idle["chrome"] = [live, dead]
+    
+    time.sleep(0.1)  # Keepalive is now pinging the slow live session
+    acquired = threading.Event()
+    threading.Thread(target=lambda: (pool._lock.acquire(), pool._lock.release(), acquired.set())).start()
+    assert acquired.wait(0.1)
+    
+    time.sleep(0.3)
+    pool._stopped.set()
+    assert dead.quit_called
+    assert pool._idle["chrome"] == [live]
@@ -0,0 +1,118 @@
+"""Tests for duration history and longest-first work planning."""
+
+from types import SimpleNamespace
+
+from src.demo.config.config import Config
+from src.demo.utils.duration_history import DurationHistory, plan_work_units, predict_makespan
+from src.demo.utils.lpt_scheduler import LongestFirstScheduling, nodeid_platform
+
+
+def test_history_predicts_median_and_platform_default(tmp_path):
+    history_file = tmp_path / "durations.json"
+    history = DurationHistory(history_file)
+    for seconds in (10, 30, 12):
+        history.record("chrome_windows", "t.py::test_login[chrome_windows]", seconds)
+    history.record("chrome_windows", "t.py::test_cart[chrome_windows]", 40)
+    history.save()
+    
+    reloaded = DurationHistory(history_file)
+    assert reloaded.predict("chrome_windows", "t.py::test_login[chrome_windows]") == 12
+    assert reloaded.predict("chrome_windows", "t.py::test_new[chrome_windows]") == 26
+    assert reloaded.predict("safari_osx", "t.py::test_login[safari_osx]") == 60
+
+
+def test_groups_stay_together_unless_they_would_serialize_the_run():
+    durations = {"a[x]": 50, "b[x]": 10, "c[x]": 10, "d[y]": 5, "e": 15}
+    groups = {"a[x]": "x", "b[x]": "x", "c[x]": "x", "d[y]": "y"}
+    
+    units = plan_work_units(durations, groups, workers=2)
+    assert [(nodeids, seconds) for _, nodeids, seconds in units] == [
+        (["a[x]"], 50), (["b[x]", "c[x]"], 20), (["e"], 15), (["d[y]"], 5),
+    ]
+    assert predict_makespan([seconds for _, _, seconds in units], workers=2) == (50, [50, 40])
+    
+    # With one worker nothing needs splitting
+    assert len(plan_work_units(durations, groups, workers=1)) == 3
+
+
+def test_nodeid_platform():
+    platforms = {"chrome_windows", "safari_osx"}
+    assert nodeid_platform("t.py::T::test_a[safari_osx]", platforms) == "safari_osx"
+    assert nodeid_platform("t.py::test_a[2-chrome_windows]", platforms) == "chrome_windows"
+    assert nodeid_platform("t.py::test_a", platforms) is None
+
+
+class FakeNode:
+    """xdist WorkerController stub recording the test indices it is sent."""
+    
+    def __init__(self, name: str):
+        self.gateway = SimpleNamespace(id=name)
+        self.sent = []
+        self.shutting_down = False
+    
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+    
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def test_scheduler_hands_out_longest_units_first(tmp_path, monkeypatch):
+    for name, value in (("DRIVER_POOL", False), ("AUTH_SNAPSHOTS", False), ("BROWSERSTACK_USERNAME", None)):
+        monkeypatch.setattr(Config, name, value)
+    seconds = {"t.py::test_a": 50, "t.py::test_b": 10, "t.py::test_c": 30, "t.py::test_d": 5, "t.py::test_e": 20}
+    history = DurationHistory(tmp_path / "durations.json")
+    for nodeid, value in seconds.items():
+        history.record("local", nodeid, value)
+    history.save()
+    config = SimpleNamespace(getvalue=lambda name: ["2*popen"], option=SimpleNamespace(loadscopereorder=True))
+    scheduler = LongestFirstScheduling(config, history=history)
+    
+    collection = list(seconds)
+    nodes = [FakeNode("gw0"), FakeNode("gw1")]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, collection)
+    scheduler.schedule()
+    
+    def sent(node):
+        return [collection[index].split("_")[-1] for index in node.sent]
+    
+    # Each worker also needs its next unit up front; it gets the one longest-first assigns it
+    assert sent(nodes[0]) == ["a", "b"]
+    assert sent(nodes[1]) == ["c", "e"]
+    
+    scheduler.mark_test_complete(nodes[1], collection.index("t.py::test_c"))
+    assert sent(nodes[1]) == ["c", "e", "d"]
+    scheduler.mark_test_complete(nodes[0], collection.index("t.py::test_a"))
+    assert nodes[0].shutting_down
+    assert scheduler.prediction == (60, [60, 55])
+
+
+def test_worker_without_planned_units_takes_the_longest_queued(tmp_path, monkeypatch):
+    for name, value in (("DRIVER_POOL", False), ("AUTH_SNAPSHOTS", False), ("BROWSERSTACK_USERNAME", None)):
+        monkeypatch.setattr(Config, name, value)
+    seconds = {"t.py::test_a": 40, "t.py::test_b": 30, "t.py::test_c": 20, "t.py::test_d": 10, "t.py::test_e": 5}
+    history = DurationHistory(tmp_path / "durations.json")
+    for nodeid, value in seconds.items():
+        history.record("local", nodeid, value)
+    history.save()
+    config = SimpleNamespace(getvalue=lambda name: ["2*popen"], option=SimpleNamespace(loadscopereorder=True))
+    scheduler = LongestFirstScheduling(config, history=history)
+    
+    collection = list(seconds)
+    nodes = [FakeNode("gw0"), FakeNode("gw1")]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, collection)
+    scheduler.schedule()
+    
+    def sent(node):
+        return [collection[index].split("_")[-1] for index in node.sent]
+    
+    assert sent(nodes[0]) == ["a", "d"]  # "e" is planned after "d"
+    assert sent(nodes[1]) == ["b", "c"]
+    
+    # gw1 finished its planned units first and takes the unit still queued
+    scheduler.mark_test_complete(nodes[1], collection.index("t.py::test_b"))
+    assert sent(nodes[1]) == ["b", "c", "e"]
@@ -0,0 +1,59 @@
+"""Tests that importing the demo package has no side effects."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from main import IMPORT_BENCH_MODULES
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in a scratch directory with a .env file, and reports what the imports touched
+PROBE = """
+import json, logging, os, sys
+before = dict(os.environ)
+import {modules}
+print(json.dumps({{
+    "heavy": [m for m in ("selenium.webdriver.remote.webdriver", "requests", "urllib3", "dotenv", "yaml")
+              if m in sys.modules],
+    "environ_changed": dict(os.environ) != before,
+    "root_handlers": len(logging.getLogger().handlers),
+    "files": sorted(os.listdir(".")),
+}}))
+"""
+
+
+def test_package_import_is_side_effect_free(tmp_path):
+    (tmp_path / ".env").write_text("DEMO_IMPORT_PROBE=1\n")
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    env.pop("DEMO_IMPORT_PROBE", None)
+    
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(modules=", ".join(IMPORT_BENCH_MODULES + ["tests.conftest"]))],
+        cwd=tmp_path, env=env, capture_output=True, text=True, check=True,
+    )
+    probe = json.loads(result.stdout)
+    
+    assert probe["heavy"] == []
+    assert not probe["environ_changed"]
+    assert probe["root_handlers"] == 0
+    assert probe["files"] == [".env"]
+
+
+def test_browserstack_credentials_come_from_dotenv(tmp_path):
+    (tmp_path / ".env").write_text("BROWSERSTACK_USERNAME=dotenv-user\nBROWSERSTACK_ACCESS_KEY=dotenv-key\n")
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    for name in ("BROWSERSTACK_USERNAME", "BROWSERSTACK_ACCESS_KEY", "USE_BROWSERSTACK"):
+        env.pop(name, None)
+    
+    probe = (
+        "from src.demo.utils.browserstack_api import BrowserStackAPI\n"
+        "from src.demo.utils.browserstack_driver_config import BrowserStackDriverConfig\n"
+        "api = BrowserStackAPI()\n"
+        "print(api.username, api.access_key, BrowserStackDriverConfig.should_use_browserstack())\n"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+    
+    assert result.stdout.split() == ["dotenv-user", "dotenv-key", "True"]
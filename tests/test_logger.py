@@ -0,0 +1,52 @@
+"""Tests for queued per-worker JSON-lines logging."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from src.demo.utils.logger import merge_worker_logs
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+WORKER_SCRIPT = """
+import logging, threading
+from src.demo.utils.logger import set_log_context, setup_logger
+setup_logger()
+set_log_context(nodeid="tests/test_x.py::test_{worker}", session_id="s-{worker}")
+for i in range(200):
+    logging.getLogger("demo").info("message %d from {worker} %s", i, "x" * 40)
+background = threading.Thread(target=lambda: logging.getLogger("demo").info("background"))
+background.start()
+background.join()
+try:
+    1 / 0
+except ZeroDivisionError:
+    logging.getLogger("demo").exception("boom")
+"""
+
+
+def test_worker_logs_rotate_and_merge(tmp_path):
+    for worker in ("gw0", "gw1"):
+        env = dict(os.environ, PYTHONPATH=str(REPO_ROOT), PYTEST_XDIST_WORKER=worker,
+                   LOG_MAX_BYTES="4096", LOG_BACKUP_COUNT="20", LOG_LEVEL="INFO")
+        subprocess.run(
+            [sys.executable, "-c", WORKER_SCRIPT.format(worker=worker)],
+            cwd=tmp_path, env=env, check=True, capture_output=True,
+        )
+    
+    log_dir = tmp_path / "logs"
+    assert list(log_dir.glob("demo_gw0.jsonl.*.gz"))
+    
+    entries = list(merge_worker_logs(log_dir))
+    assert len(entries) == 2 * 202
+    assert [e["ts"] for e in entries] == sorted(e["ts"] for e in entries)
+    
+    gw0 = [e for e in entries if e["worker"] == "gw0"]
+    assert [e["message"] for e in gw0[:2]] == [f"message {i} from gw0 {'x' * 40}" for i in range(2)]
+    assert {e["nodeid"] for e in gw0 if e["message"] != "background"} == {"tests/test_x.py::test_gw0"}
+    background = next(e for e in gw0 if e["message"] == "background")
+    assert background["nodeid"] is None and background["session_id"] is None
+    assert gw0[-1]["session_id"] == "s-gw0"
+    assert gw0[-1]["message"] == "boom"
+    assert "ZeroDivisionError" in gw0[-1]["exc"]
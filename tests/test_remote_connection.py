@@ -0,0 +1,124 @@
+"""Tests for the pooled Remote WebDriver transport against a local stub endpoint."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from selenium.webdriver.remote.command import Command
+from urllib3.exceptions import HTTPError
+
+from src.demo.config.config import Config
+from src.demo.utils.remote_connection import PooledRemoteConnection
+
+
+class StubW3CHandler(BaseHTTPRequestHandler):
+    """Minimal W3C endpoint; ``server.drop`` paths close the connection once."""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.server.requests.append((self.command, self.path, self.headers.get("Authorization")))
+        
+        if self.path in self.server.drop:
+            self.server.drop.remove(self.path)
+            self.close_connection = True
+            return
+        if self.path.endswith("/title"):
+            time.sleep(self.server.delay)
+        if self.path in self.server.status:
+            body = b"<html><body>Bad Gateway</body></html>"
+            self.send_response(self.server.status[self.path])
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        
+        value = {"sessionId": "s1", "capabilities": {}} if self.path == "/session" else "about:blank"
+        body = json.dumps({"value": value}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    do_GET = do_POST = do_DELETE = _handle
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubW3CHandler)
+    server.requests = []
+    server.drop = set()
+    server.delay = 0
+    server.status = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def connection(stub_server):
+    host, port = stub_server.server_address
+    return PooledRemoteConnection(f"http://{host}:{port}", username="user", password="key", retries=1)
+
+
+def test_connections_are_reused_across_commands(connection, stub_server):
+    for _ in range(5):
+        response = connection.execute(Command.GET_CURRENT_URL, {"sessionId": "s1"})
+        assert response["value"] == "about:blank"
+    
+    stats = connection.stats.as_dict()
+    assert stats["requests"] == 5
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 4
+    assert all(auth and auth.startswith("Basic ") for _, _, auth in stub_server.requests)
+
+
+def test_idempotent_command_is_retried(connection, stub_server):
+    stub_server.drop.add("/session/s1/url")
+    
+    response = connection.execute(Command.GET_CURRENT_URL, {"sessionId": "s1"})
+    
+    assert response["value"] == "about:blank"
+    assert len(stub_server.requests) == 2
+    assert connection.stats.as_dict()["retries"] == 1
+
+
+def test_non_idempotent_command_is_not_retried(connection, stub_server):
+    stub_server.drop.add("/session/s1/element/e1/click")
+    
+    with pytest.raises(HTTPError):
+        connection.execute(Command.CLICK_ELEMENT, {"sessionId": "s1", "id": "e1"})
+    
+    assert len(stub_server.requests) == 1
+
+
+def test_last_status_exposes_gateway_errors(connection, stub_server):
+    stub_server.status["/session"] = 502
+    
+    response = connection.execute(Command.NEW_SESSION, {"capabilities": {}})
+    
+    assert response["status"] == 502
+    assert connection.last_status == 502
+    connection.execute(Command.GET_CURRENT_URL, {"sessionId": "s1"})
+    assert connection.last_status == 200
+
+
+def test_command_timeout_applies(connection, stub_server, monkeypatch):
+    monkeypatch.setattr(Config, "REMOTE_COMMAND_TIMEOUT", 0.2)
+    connection.max_retries = 0
+    stub_server.delay = 1
+    
+    with pytest.raises(HTTPError):
+        connection.execute(Command.GET_TITLE, {"sessionId": "s1"})
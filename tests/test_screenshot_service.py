@@ -0,0 +1,87 @@
+"""Tests for the background screenshot writer."""
+
+import base64
+import struct
+import zlib
+
+from src.demo.utils.screenshot_service import ScreenshotService, optimize_png, prune_screenshot_stores
+
+
+def make_png(width: int, height: int, shade: int) -> bytes:
+    """Build a grey-scale PNG the way a browser would: fast, lightly compressed."""
+    def chunk(kind: bytes, payload: bytes) -> bytes:
+        return struct.pack(">I", len(payload)) + kind + payload + struct.pack(">I", zlib.crc32(kind + payload))
+    
+    rows = b"".join(b"\x00" + bytes([shade]) * width for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows, 0))
+        + chunk(b"IEND", b"")
+    )
+
+
+class FakeDriver:
+    """Driver stub returning a fixed screenshot payload."""
+    
+    def __init__(self, png: bytes):
+        self.payload = base64.b64encode(png).decode()
+    
+    def get_screenshot_as_base64(self) -> str:
+        return self.payload
+
+
+def test_duplicates_are_hard_linked_and_optimized(tmp_path):
+    png = make_png(200, 100, 128)
+    service = ScreenshotService(output_dir=tmp_path, build="42", max_bytes=10 * 1024 * 1024)
+    
+    first = service.capture(FakeDriver(png), "login_retry_1")
+    second = service.capture(FakeDriver(png), "login_retry_2")
+    assert service.flush(timeout=10)
+    
+    assert first.stat().st_ino == second.stat().st_ino
+    assert len(list((tmp_path / ".by-hash" / "42").glob("*.png"))) == 1
+    assert first.stat().st_size < len(png)
+    assert service.stats == {"captured": 2, "written": 1, "deduplicated": 1, "dropped": 0}
+
+
+def test_new_images_are_dropped_over_build_budget(tmp_path):
+    first_png, second_png = make_png(50, 50, 10), make_png(50, 50, 200)
+    service = ScreenshotService(output_dir=tmp_path, build="42", max_bytes=len(optimize_png(first_png)))
+    
+    kept = service.capture(FakeDriver(first_png), "first")
+    dropped = service.capture(FakeDriver(second_png), "second")
+    duplicate = service.capture(FakeDriver(first_png), "first_again")
+    assert service.flush(timeout=10)
+    
+    assert kept.exists() and duplicate.exists()
+    assert not dropped.exists()
+    assert service.stats["dropped"] == 1
+
+
+def test_workers_share_one_build_budget(tmp_path):
+    pngs = [make_png(50, 50, shade) for shade in (10, 90, 170, 250)]
+    budget = sum(len(optimize_png(png)) for png in pngs[:2])
+    workers = [ScreenshotService(output_dir=tmp_path, build="42", max_bytes=budget) for _ in range(2)]
+    
+    for index, png in enumerate(pngs):
+        for worker in workers:
+            worker.capture(FakeDriver(png), f"shot_{index}_{id(worker)}")
+    assert all(worker.flush(timeout=10) for worker in workers)
+    
+    store = tmp_path / ".by-hash" / "42"
+    assert sum(p.stat().st_size for p in store.glob("*.png")) <= budget
+    assert sum(worker.stats["written"] for worker in workers) == 2
+    assert sum(worker.stats["dropped"] for worker in workers) == 4
+
+
+def test_other_builds_stores_are_pruned(tmp_path):
+    service = ScreenshotService(output_dir=tmp_path, build="41", max_bytes=10 * 1024 * 1024)
+    kept = service.capture(FakeDriver(make_png(10, 10, 1)), "old_build")
+    assert service.flush(timeout=10)
+    (tmp_path / ".by-hash" / "42").mkdir()
+    
+    prune_screenshot_stores(tmp_path, keep="42")
+    
+    assert [p.name for p in (tmp_path / ".by-hash").iterdir()] == ["42"]
+    assert kept.exists()
@@ -0,0 +1,28 @@
+"""Tests for background session pre-warming."""
+
+from src.demo.utils.driver_factory import SessionPrefetcher
+
+from .helpers import FakeSession
+
+
+def test_dead_prewarmed_session_is_quit_instead_of_handed_out():
+    prefetcher = SessionPrefetcher(lookahead=1)
+    session = FakeSession("s1")
+    prefetcher.top_up((False, "chrome"), lambda: session)
+    prefetcher._pending[(False, "chrome")][0].result()
+    session.alive = False
+    
+    assert prefetcher.take((False, "chrome")) is None
+    assert session.quit_called
+    prefetcher.close(timeout=1)
+
+
+def test_pending_browserstack_sessions_are_capped_across_platforms():
+    prefetcher = SessionPrefetcher(lookahead=2, max_remote=3)
+    for platform in ("chrome", "firefox", "galaxy"):
+        prefetcher.top_up((True, platform), lambda: FakeSession(platform))
+    prefetcher.top_up((False, "chrome"), lambda: FakeSession("local"))
+    
+    pending = {key: len(futures) for key, futures in prefetcher._pending.items()}
+    assert pending == {(True, "chrome"): 2, (True, "firefox"): 1, (True, "galaxy"): 0, (False, "chrome"): 2}
+    prefetcher.close(timeout=1)
@@ -0,0 +1,90 @@
+"""Tests for step checkpoints and in-place step retries."""
+
+import pytest
+from selenium.common.exceptions import ElementClickInterceptedException, StaleElementReferenceException
+
+from src.demo.utils.steps import completed_steps, step, take_step_records
+
+
+class FlakyPage:
+    """Page stub whose click fails with the queued errors before succeeding."""
+    
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.clicks = 0
+        self.recoveries = 0
+    
+    def recover_step(self):
+        self.recoveries += 1
+    
+    @step("Click button", attempts=3)
+    def click(self):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.clicks += 1
+        return "clicked"
+
+
+@pytest.fixture(autouse=True)
+def fresh_records():
+    take_step_records()
+    yield
+    take_step_records()
+
+
+def test_retryable_errors_rerun_only_the_step():
+    page = FlakyPage(StaleElementReferenceException(), ElementClickInterceptedException())
+    
+    with step("Login"):
+        pass
+    assert page.click() == "clicked"
+    
+    assert (page.clicks, page.recoveries) == (1, 2)
+    assert completed_steps() == ["Login", "Click button"]
+    records = take_step_records()
+    assert [(r["name"], r["status"], r["attempts"]) for r in records] == [
+        ("Login", "passed", 1), ("Click button", "passed", 3),
+    ]
+
+
+def test_step_fails_when_attempts_run_out_or_error_is_not_retryable():
+    with pytest.raises(StaleElementReferenceException):
+        FlakyPage(*[StaleElementReferenceException()] * 3).click()
+    with pytest.raises(ValueError):
+        FlakyPage(ValueError("bad state")).click()
+    with pytest.raises(AssertionError):
+        with step("Verify"):
+            assert False
+    
+    records = take_step_records()
+    assert [(r["status"], r["attempts"], r["error"]) for r in records] == [
+        ("failed", 3, "StaleElementReferenceException"),
+        ("failed", 1, "ValueError"),
+        ("failed", 1, "AssertionError"),
+    ]
+
+
+def test_page_steps_retry_the_click_but_not_the_settle_wait(monkeypatch):
+    from src.demo.pages.products_page import ProductsPage
+    
+    page = ProductsPage(driver=None)
+    clicks = []
+    failures = [StaleElementReferenceException()]
+    
+    def click_element(by, value):
+        if failures:
+            raise failures.pop()
+        clicks.append(value)
+    
+    def wait_until_settled():
+        raise StaleElementReferenceException("re-rendered while settling")
+    
+    monkeypatch.setattr(page, "click_element", click_element)
+    monkeypatch.setattr(page, "recover_step", lambda: None)
+    monkeypatch.setattr(page, "wait_until_settled", wait_until_settled)
+    
+    with pytest.raises(StaleElementReferenceException, match="settling"):
+        page.navigate_to_favorites()
+    
+    assert clicks == ["Favourites"]
+    assert [(r["name"], r["attempts"]) for r in take_step_records()] == [("Click Favourites link", 2)]